@@ -1,3 +1,5 @@
+import asyncio
+import bisect
 import logging
 import time
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -5,21 +7,47 @@ from telegram.ext import ContextTypes
 from datetime import datetime
 from config import *
 from github_manager import GitHubManager
-from utils.helpers import convert_to_timestamp, parse_user_info
+from utils.helpers import parse_user_info
+from storage.games_index import make_index_row, mark_has_stats, row_to_game_info
+from storage.games_layout import game_file_name, game_file_path
+from bot.schedule_model import ScheduleModel
+from bot.venue_calendar import available_times, parse_venues, serialize_venues, to_minutes, venue_settings
 
 logger = logging.getLogger(__name__)
 
+
+def _path_changed(changed_paths, path):
+    """Затронут ли путь (файл или директория) изменением одного из changed_paths"""
+    return any(
+        changed == path or changed.startswith(path + "/") or path.startswith(changed + "/")
+        for changed in changed_paths
+    )
+
+def _count_played_game(games_played, row):
+    """Увеличить счётчики сыгранных игр обеих команд из строки индекса игр"""
+    league_counts = games_played.setdefault(row["league"], {})
+    for team in (row["team_a"], row["team_b"]):
+        league_counts[team] = league_counts.get(team, 0) + 1
+
 class BasketballChampionshipBot:
     def __init__(self, token, github_manager):
         self.token = token
         self.github_manager = github_manager
         self.leagues = {}
+        # Таблицы, которые строит organize_teams_by_league
+        self.team_leagues = {}
+        self.league_ids = {}
         self.venues = []
+        self.venue_entries = {}  # залы с настройками из venues.json
         self.schedule_data = {"season": "2025-2026", "stages": []}
         self.leagues_config = {}
         self.pending_matches = []
         self.pending_results = []
         self.temp_files = []
+        self._schedule_model = None
+        # Параллельные апдейты не должны одновременно применять изменения, перезагружать
+        # данные и удалять матчи - все они меняют расписание и очереди ожидающих изменений
+        self.data_lock = asyncio.Lock()
 
         # Кэш для оптимизации поиска игр
         self._games_cache = None
@@ -30,18 +58,51 @@ class BasketballChampionshipBot:
         # Кэш для номеров игр со статистикой
         self._games_with_stats_cache = None
         self._games_with_stats_cache_timestamp = 0
+        
+        # Кэш индекса игр (data/games/index.json)
+        self._games_index_cache = None
+        self._games_index_cache_timestamp = 0
+        
+        # Сыгранные игры по лигам и признаки завершения регулярного сезона
+        self._games_played = None
+        self._regular_season_complete = {}
+        self._regular_season_source = None
+        
+        # Кэш турнирной таблицы (data/standings.json)
+        self._standings_cache = None
+        self._standings_cache_timestamp = 0
+
+        # Версии путей хранилища при последней проверке изменений
+        self._change_marks = None
+        self._change_check_timestamp = 0
+        self._changes_tracked = False
+        # Изменения приходят webhook'ом - опрос хранилища становится редкой страховкой
+        self.push_notifications = False
     
-    def load_data_from_github(self):
-        """Загрузка всех данных из GitHub"""
+    async def load_cached_data(self):
+        """Загрузка последней локальной копии данных (без сети), чтобы сразу отвечать пользователям"""
         try:
-            teams_data = self.github_manager.get_teams_data()
-            self.leagues = self.organize_teams_by_league(teams_data)
-            
-            self.venues = self.github_manager.get_venues_data()
-            self.schedule_data = self.github_manager.get_schedule_data()
-            
-            # Загружаем конфигурацию лиг
-            self.leagues_config = self.github_manager.get_leagues_config()
+            teams_data, venues, schedule_data, leagues_config = await self.github_manager.get_cached_startup_data()
+            self._apply_loaded_data(teams_data, venues, schedule_data, leagues_config)
+            logger.info("Загружена локальная копия данных")
+            return True
+
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке локальной копии данных: {e}")
+            return False
+
+    async def load_data_from_github(self):
+        """Загрузка всех данных из GitHub (четыре файла параллельно)"""
+        try:
+            async with self.data_lock:
+                teams_data, venues, schedule_data, leagues_config = await asyncio.gather(
+                    self.github_manager.get_teams_data(),
+                    self.github_manager.get_venues_data(),
+                    self.github_manager.get_schedule_data(),
+                    # Загружаем конфигурацию лиг
+                    self.github_manager.get_leagues_config(),
+                )
+                self._apply_loaded_data(teams_data, venues, schedule_data, leagues_config)
             
             logger.info("Данные успешно загружены")
             return True
@@ -49,10 +110,23 @@ class BasketballChampionshipBot:
         except Exception as e:
             logger.error(f"Ошибка при загрузке данных: {e}")
             return False
+
+    def _apply_loaded_data(self, teams_data, venues, schedule_data, leagues_config):
+        self.leagues = self.organize_teams_by_league(teams_data)
+        self.venues, self.venue_entries = parse_venues(venues)
+        self.schedule_data = schedule_data
+        self.leagues_config = leagues_config
     
     def organize_teams_by_league(self, teams_data):
-        """Организовать команды по лигам"""
+        """Организовать команды по лигам.
+
+        Заодно строятся порядковые номера лиг (в порядке teams.json) и таблица
+        команда -> лига. Команда, заявленная в нескольких лигах, относится к
+        первой из них по порядку лиг, а неоднозначность сообщается в журнал
+        здесь, при загрузке.
+        """
         leagues = {}
+        team_league_names = {}
         for team in teams_data:
             league_name = team.get('league', 'Без лиги')
             if league_name not in leagues:
@@ -62,146 +136,162 @@ class BasketballChampionshipBot:
                 }
             leagues[league_name]["teams"].append(team['name'])
             leagues[league_name]["full_data"].append(team)
+
+            names = team_league_names.setdefault(team['name'], [])
+            if league_name in names:
+                logger.warning(f"Команда '{team['name']}' повторяется в лиге '{league_name}'")
+            else:
+                names.append(league_name)
+
+        league_ids = {league_name: i for i, league_name in enumerate(leagues)}
+        team_leagues = {}
+        for team_name, names in team_league_names.items():
+            team_leagues[team_name] = min(names, key=league_ids.get)
+            if len(names) > 1:
+                logger.warning(
+                    f"Команда '{team_name}' заявлена в нескольких лигах: {', '.join(names)}. "
+                    f"Её матчи относятся к лиге '{team_leagues[team_name]}'"
+                )
+
+        self.team_leagues = team_leagues
+        self.league_ids = league_ids
         return leagues
     
-    def determine_game_type(self, league, team_home, team_away, date):
+    async def determine_game_type(self, league, team_home, team_away, date):
         """
         Определить тип игры (regular/playoff) на основе количества сыгранных матчей
-        в регулярном сезоне для данной лиги
+        в регулярном сезоне для данной лиги.
+
+        Счётчики сыгранных игр и признак завершения регулярного сезона хранятся
+        в памяти, поэтому решение не требует запросов к хранилищу.
         """
         try:
-            # Загружаем конфигурацию лиг
-            leagues_config = self.github_manager.get_leagues_config()
-            
-            # Находим ID лиги по её названию
-            league_id = None
-            for lid, config in leagues_config.items():
-                if lid == league:
-                    league_id = lid
-                    break
-            
-            if not league_id:
-                logger.warning(f"Лига '{league}' не найдена в конфигурации, используется regular")
-                return "regular"
-            
-            # Получаем количество кругов регулярного сезона
-            regular_rounds = leagues_config[league_id].get('regularSeasonRounds', 1)
-            
-            # Получаем все команды лиги
-            teams_in_league = self.leagues.get(league, {}).get('teams', [])
-            num_teams = len(teams_in_league)
-            
-            if num_teams < 2:
-                return "regular"
-            
-            # Количество матчей в регулярном сезоне для каждой команды
-            # В двухкруговом турнире каждая команда играет с каждой дважды
-            matches_per_team_in_regular = (num_teams - 1) * regular_rounds
-            
-            # Получаем ВСЕ сыгранные матчи (по наличию файлов в games/)
-            all_played_games = self.get_all_games_cached()
-            
-            # Словарь для подсчета сыгранных матчей каждой команды
-            team_played_matches = {team: 0 for team in teams_in_league}
-            
-            for game_info in all_played_games:
-                game_data = game_info.get('data', {})
-                match_info = game_data.get('match_info', {})
-                
-                # Получаем лигу из данных игры
-                game_league = match_info.get('league') or match_info.get('competition', '')
-                
-                # Проверяем, относится ли игра к нужной лиге
-                if game_league == league:
-                    team_a = match_info.get('team_a', '')
-                    team_b = match_info.get('team_b', '')
-                    
-                    if team_a in team_played_matches:
-                        team_played_matches[team_a] += 1
-                    if team_b in team_played_matches:
-                        team_played_matches[team_b] += 1
-            
-            # Логируем статистику для отладки
-            logger.info(f"Статистика сыгранных матчей для лиги '{league}' (определено по файлам в games/):")
-            for team, played in team_played_matches.items():
-                logger.info(f"  {team}: {played}/{matches_per_team_in_regular}")
-            
-            # Проверяем, завершен ли регулярный сезон для КАЖДОЙ команды
-            regular_season_finished = True
-            teams_not_finished = []
-            
-            for team, played in team_played_matches.items():
-                if played < matches_per_team_in_regular:
-                    regular_season_finished = False
-                    teams_not_finished.append(f"{team} ({played}/{matches_per_team_in_regular})")
-            
-            if regular_season_finished:
-                logger.info(f"✅ Регулярный сезон для лиги '{league}' завершен. Матч определяется как playoff")
+            if await self._is_regular_season_complete(league):
                 return "playoff"
-            else:
-                logger.info(f"❌ Регулярный сезон для лиги '{league}' не завершен. Не сыграли: {', '.join(teams_not_finished)}")
-                return "regular"
-                
+            return "regular"
         except Exception as e:
             logger.error(f"Ошибка при определении gameType для лиги '{league}': {e}")
             return "regular"
 
+    async def _is_regular_season_complete(self, league):
+        """Признак завершения регулярного сезона лиги (кэшируется до изменения данных)"""
+        # Признаки зависят от состава лиг и их конфигурации - при перезагрузке считаются заново
+        if self._regular_season_source != (self.leagues, self.leagues_config):
+            self._regular_season_source = (self.leagues, self.leagues_config)
+            self._regular_season_complete = {}
+
+        games_played = await self._get_games_played()
+        if league not in self._regular_season_complete:
+            self._regular_season_complete[league] = self._check_regular_season_complete(
+                league, games_played.get(league, {})
+            )
+        return self._regular_season_complete[league]
+
+    def _check_regular_season_complete(self, league, team_played_matches):
+        if league not in self.leagues_config:
+            logger.warning(f"Лига '{league}' не найдена в конфигурации, используется regular")
+            return False
+        
+        # Получаем количество кругов регулярного сезона
+        regular_rounds = self.leagues_config[league].get('regularSeasonRounds', 1)
+        
+        # Получаем все команды лиги
+        teams_in_league = self.leagues.get(league, {}).get('teams', [])
+        num_teams = len(teams_in_league)
+        
+        if num_teams < 2:
+            return False
+        
+        # Количество матчей в регулярном сезоне для каждой команды
+        # В двухкруговом турнире каждая команда играет с каждой дважды
+        matches_per_team_in_regular = (num_teams - 1) * regular_rounds
+        
+        # Проверяем, завершен ли регулярный сезон для КАЖДОЙ команды
+        teams_not_finished = [
+            f"{team} ({team_played_matches.get(team, 0)}/{matches_per_team_in_regular})"
+            for team in teams_in_league
+            if team_played_matches.get(team, 0) < matches_per_team_in_regular
+        ]
+        
+        if not teams_not_finished:
+            logger.info(f"✅ Регулярный сезон для лиги '{league}' завершен. Матчи определяются как playoff")
+            return True
+        logger.debug(f"Регулярный сезон для лиги '{league}' не завершен. Не сыграли: {', '.join(teams_not_finished)}")
+        return False
+
+    async def _get_games_played(self):
+        """{лига: {команда: сыграно игр}} - строится по индексу игр, затем обновляется при сохранении результатов"""
+        if self._games_played is None:
+            games_index = await self.get_games_index_cached()
+            games_played = {}
+            for row in games_index["games"]:
+                _count_played_game(games_played, row)
+            self._games_played = games_played
+            self._regular_season_complete = {}
+        return self._games_played
+
+    def record_played_games(self, results):
+        """Учесть сохранённые результаты в счётчиках сыгранных игр"""
+        if self._games_played is None:
+            return
+        for result in results:
+            row = make_index_row(0, result)
+            _count_played_game(self._games_played, row)
+            self._regular_season_complete.pop(row["league"], None)
+
+    def get_schedule_model(self):
+        """Модель расписания с индексами; перестраивается только при смене данных"""
+        data_version = self.github_manager.data_version
+        if (self._schedule_model is None or
+                not self._schedule_model.is_built_from(self.schedule_data, self.leagues, data_version)):
+            self._schedule_model = ScheduleModel(self.schedule_data, self.leagues, self.find_league_for_teams,
+                                                 data_version)
+        return self._schedule_model
+
     def get_all_matches(self):
         """Получить все матчи из расписания в плоском формате"""
-        all_matches = []
-        for stage in self.schedule_data.get("stages", []):
-            for game in stage.get("games", []):
-                league = self.find_league_for_teams(game.get("teamHome"), game.get("teamAway"))
-                match_info = {
-                    'stage': stage.get('name', 'Неизвестный этап'),
-                    'league': league,
-                    'teamHome': game.get('teamHome'),
-                    'teamAway': game.get('teamAway'),
-                    'date': game.get('date'),
-                    'time': game.get('time'),
-                    'location': game.get('location'),
-                    'datetime': f"{game.get('date')} {game.get('time')}",
-                    'timestamp': convert_to_timestamp(game.get('date'), game.get('time'))
-                }
-                all_matches.append(match_info)
-        return sorted(all_matches, key=lambda x: x['timestamp'])
+        return self.get_schedule_model().matches()
     
+    def get_available_times(self, venue, date):
+        """Свободное время в зале на дату с учётом расписания и ожидающих матчей"""
+        busy_starts = [
+            to_minutes(match['time'])
+            for match in self.get_schedule_model().matches_at_venue_on(venue, date)
+            if match['timestamp']
+        ]
+        for match in self.pending_matches:
+            if match['location'] == venue and match['date'] == date:
+                bisect.insort(busy_starts, to_minutes(match['time']))
+        return available_times(venue_settings(self.venue_entries.get(venue)), date, busy_starts)
+
+    def get_venues_data(self):
+        """Залы в формате venues.json (с настройками залов)"""
+        return serialize_venues(self.venues, self.venue_entries)
+
     def find_league_for_teams(self, team1, team2):
-        """Найти лигу для команд"""
-        for league_name, league_data in self.leagues.items():
-            if team1 in league_data["teams"] or team2 in league_data["teams"]:
-                return league_name
-        return "Неизвестная лига"
+        """Найти лигу для команд: первая по порядку лиг, в которой есть хотя бы одна из команд"""
+        league_names = [self.team_leagues[team] for team in (team1, team2) if team in self.team_leagues]
+        if not league_names:
+            return "Неизвестная лига"
+        return min(league_names, key=self.league_ids.get)
 
-    def get_games_without_stats(self, league=None):
+    async def get_games_without_stats(self, league=None):
         """Получить игры без статистики с кэшированием"""
         cache_key = league or 'all'
         
-        # Проверяем кэш (актуален в течение 30 секунд)
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 30 секунд)
         current_time = time.time()
-        if (cache_key in self._games_without_stats_cache and 
-            current_time - self._games_without_stats_cache_timestamp.get(cache_key, 0) < 30):
+        if (await self._cache_is_fresh(self._games_without_stats_cache_timestamp.get(cache_key, 0), 30) and
+                cache_key in self._games_without_stats_cache):
             return self._games_without_stats_cache[cache_key]
         
-        # Получаем игры со статистикой из кэша
-        games_with_stats = self.get_games_with_statistics()
-        
-        # Получаем все игры из кэша
-        all_games = self.get_all_games_cached()
-        games_without_stats = []
-        
-        for game in all_games:
-            game_number = self.github_manager.extract_game_number(game['file_name'])
-            if game_number not in games_with_stats:
-                # Проверяем лигу если указана
-                if league:
-                    game_league = self.github_manager.get_game_league(game.get('data', {}))
-                    if game_league != league:
-                        continue
-                
-                # Добавляем номер игры в объект для быстрого доступа
-                game['game_number'] = game_number
-                games_without_stats.append(game)
+        # Строим список по индексу игр, без загрузки файлов
+        games_index = await self.get_games_index_cached()
+        games_without_stats = [
+            row_to_game_info(row, game_file_path(row["number"]))
+            for row in games_index["games"]
+            if not row["has_stats"] and (not league or row["league"] == league)
+        ]
         
         # Сортируем по номеру игры (по убыванию - самые новые первые)
         games_without_stats.sort(key=lambda x: x['game_number'], reverse=True)
@@ -212,16 +302,117 @@ class BasketballChampionshipBot:
         
         return games_without_stats[:5]  # Возвращаем только 5 последних игр
     
-    def get_all_games_cached(self):
+    async def check_for_changes(self):
+        """Сбросить кэши путей, изменившихся в хранилище с прошлой проверки.
+
+        Проверка (один условный запрос листинга data/) выполняется не чаще раза
+        в CHANGE_CHECK_INTERVAL секунд. Возвращает False, если хранилище не
+        отслеживает изменения - тогда кэши живут по времени.
+        """
+        current_time = time.time()
+        interval = WEBHOOK_CHANGE_CHECK_INTERVAL if self.push_notifications else CHANGE_CHECK_INTERVAL
+        if current_time - self._change_check_timestamp < interval:
+            return self._changes_tracked
+        self._change_check_timestamp = current_time
+
+        marks = await self.github_manager.get_change_marks()
+        self._changes_tracked = marks is not None
+        if marks is None:
+            return False
+
+        if self._change_marks is not None:
+            changed_paths = {
+                path for path in set(marks) | set(self._change_marks)
+                if marks.get(path) != self._change_marks.get(path)
+            }
+            if changed_paths:
+                logger.info(f"Данные в хранилище изменились: {', '.join(sorted(changed_paths))}")
+                self.invalidate_caches(changed_paths)
+        self._change_marks = marks
+        return True
+
+    async def apply_remote_changes(self, changed_paths):
+        """Обновить данные, изменённые в хранилище извне (webhook push)"""
+        self.invalidate_caches(changed_paths)
+        try:
+            async with self.data_lock:
+                if _path_changed(changed_paths, TEAMS_FILE_PATH):
+                    self.leagues = self.organize_teams_by_league(await self.github_manager.get_teams_data())
+                if _path_changed(changed_paths, VENUES_FILE_PATH):
+                    self.venues, self.venue_entries = parse_venues(await self.github_manager.get_venues_data())
+                if _path_changed(changed_paths, SCHEDULE_FILE_PATH):
+                    self.schedule_data = await self.github_manager.get_schedule_data()
+                if _path_changed(changed_paths, CONFIG_FILE_PATH):
+                    self.leagues_config = await self.github_manager.get_leagues_config()
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении данных после изменений в хранилище: {e}")
+
+    async def _cache_is_fresh(self, timestamp, ttl):
+        """Кэш актуален, пока данные не изменились; без отслеживания изменений - ttl секунд"""
+        if await self.check_for_changes():
+            return True
+        return time.time() - timestamp < ttl
+
+    def invalidate_caches(self, changed_paths):
+        """Сбросить кэши, зависящие от изменившихся путей хранилища"""
+        games_changed = _path_changed(changed_paths, GAMES_DIR_PATH)
+        stats_changed = _path_changed(changed_paths, RESULT_IMAGES_DIR)
+        if games_changed:
+            self._games_cache = None
+            self._games_index_cache = None
+            self._games_played = None
+        if games_changed or _path_changed(changed_paths, STANDINGS_FILE_PATH):
+            self._standings_cache = None
+        if stats_changed:
+            self._games_with_stats_cache = None
+        if games_changed or stats_changed:
+            self._games_without_stats_cache = {}
+            self._games_without_stats_cache_timestamp = {}
+
+    async def get_games_index_cached(self):
+        """Получить индекс игр с кэшированием"""
+        current_time = time.time()
+        
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 60 секунд)
+        if (await self._cache_is_fresh(self._games_index_cache_timestamp, 60) and
+                self._games_index_cache is not None):
+            return self._games_index_cache
+        
+        games_index = await self.github_manager.get_games_index()
+        
+        # Сохраняем в кэш
+        self._games_index_cache = games_index
+        self._games_index_cache_timestamp = current_time
+        
+        return games_index
+    
+    async def get_standings_cached(self):
+        """Получить турнирную таблицу с кэшированием"""
+        current_time = time.time()
+        
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 60 секунд)
+        if (await self._cache_is_fresh(self._standings_cache_timestamp, 60) and
+                self._standings_cache is not None):
+            return self._standings_cache
+        
+        standings = await self.github_manager.get_standings(await self.get_games_index_cached())
+        
+        # Сохраняем в кэш
+        self._standings_cache = standings
+        self._standings_cache_timestamp = current_time
+        
+        return standings
+    
+    async def get_all_games_cached(self):
         """Получить все игры с кэшированием"""
         current_time = time.time()
         
-        # Проверяем кэш (актуален в течение 60 секунд)
-        if (self._games_cache is not None and 
-            current_time - self._games_cache_timestamp < 60):
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 60 секунд)
+        if (await self._cache_is_fresh(self._games_cache_timestamp, 60) and
+                self._games_cache is not None):
             return self._games_cache
         
-        games = self.github_manager.get_all_games()
+        games = await self.github_manager.get_all_games()
         
         # Сохраняем в кэш
         self._games_cache = games
@@ -229,17 +420,17 @@ class BasketballChampionshipBot:
         
         return games
     
-    def get_games_with_statistics(self):
+    async def get_games_with_statistics(self):
         """Получить игры со статистикой с кэшированием"""
         current_time = time.time()
         
-        # Проверяем кэш (актуален в течение 60 секунд)
-        if (self._games_with_stats_cache is not None and 
-            current_time - self._games_with_stats_cache_timestamp < 60):
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 60 секунд)
+        if (await self._cache_is_fresh(self._games_with_stats_cache_timestamp, 60) and
+                self._games_with_stats_cache is not None):
             return self._games_with_stats_cache
         
         # Загружаем игры со статистикой
-        games_with_stats = self.github_manager.get_games_with_statistics()
+        games_with_stats = await self.github_manager.get_games_with_statistics()
         
         # Сохраняем в кэш
         self._games_with_stats_cache = games_with_stats
@@ -247,7 +438,7 @@ class BasketballChampionshipBot:
         
         return games_with_stats
     
-    def get_game_by_number_cached(self, game_number):
+    async def get_game_by_number_cached(self, game_number):
         """Получить игру по номеру с использованием кэша"""
         # Проверяем в кэше игр без статистики
         for cache_key in self._games_without_stats_cache:
@@ -257,7 +448,7 @@ class BasketballChampionshipBot:
                         return game_info
         
         # Если не нашли в кэше, ищем во всех играх
-        all_games = self.get_all_games_cached()
+        all_games = await self.get_all_games_cached()
         for game_info in all_games:
             if self.github_manager.extract_game_number(game_info['file_name']) == game_number:
                 # Добавляем номер игры для быстрого доступа
@@ -265,14 +456,14 @@ class BasketballChampionshipBot:
                 return game_info
         
         # Если не нашли, загружаем напрямую
-        filename = f"game_{game_number:03d}.json"
-        game_data = self.github_manager._load_game_data(filename)
+        filename = game_file_name(game_number)
+        game_data = await self.github_manager._load_game_data(filename)
         if game_data:
             return {
                 'file_name': filename,
                 'data': game_data,
                 'game_number': game_number,
-                'path': f"{GAMES_DIR_PATH}/{filename}"
+                'path': game_file_path(game_number)
             }
         return None
     
@@ -282,6 +473,10 @@ class BasketballChampionshipBot:
         if self._games_with_stats_cache is not None:
             self._games_with_stats_cache.add(game_number)
         
+        # Обновляем кэш индекса игр
+        if self._games_index_cache is not None:
+            mark_has_stats(self._games_index_cache, game_number)
+        
         # Обновляем кэш игр без статистики
         for key in list(self._games_without_stats_cache.keys()):
             if key in self._games_without_stats_cache:
@@ -290,32 +485,24 @@ class BasketballChampionshipBot:
                     if game.get('game_number') != game_number
                 ]
 
-    def get_games_without_stats_optimized(self, league=None):
+    async def get_games_without_stats_optimized(self, league=None):
         """Оптимизированное получение игр без статистики"""
         cache_key = league or 'all'
         current_time = time.time()
         
-        # Проверяем кэш (актуален в течение 30 секунд)
-        if (cache_key in self._games_without_stats_cache and 
-            current_time - self._games_without_stats_cache_timestamp.get(cache_key, 0) < 30):
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 30 секунд)
+        if (await self._cache_is_fresh(self._games_without_stats_cache_timestamp.get(cache_key, 0), 30) and
+                cache_key in self._games_without_stats_cache):
             cached_games = self._games_without_stats_cache[cache_key]
             # Убедимся, что у всех игр есть данные
-            for game_info in cached_games:
-                if 'data' not in game_info:
-                    game_data = self.github_manager._load_game_data(game_info['file_name'])
-                    if game_data:
-                        game_info['data'] = game_data
+            await self._fill_games_data(cached_games)
             return cached_games
         
         # Используем оптимизированный метод
-        games_without_stats = self.github_manager.get_games_without_statistics_optimized(league)
+        games_without_stats = await self.github_manager.get_games_without_statistics_optimized(league)
         
         # Дозагружаем данные для отображения
-        for game_info in games_without_stats:
-            if 'data' not in game_info:
-                game_data = self.github_manager._load_game_data(game_info['file_name'])
-                if game_data:
-                    game_info['data'] = game_data
+        await self._fill_games_data(games_without_stats)
         
         # Сохраняем в кэш
         self._games_without_stats_cache[cache_key] = games_without_stats
@@ -323,6 +510,16 @@ class BasketballChampionshipBot:
         
         return games_without_stats
 
+    async def _fill_games_data(self, games):
+        """Дозагрузить (параллельно) данные игр, у которых их нет"""
+        missing = [game_info['file_name'] for game_info in games if 'data' not in game_info]
+        if not missing:
+            return
+        games_data = await self.github_manager.load_games_data(missing)
+        for game_info in games:
+            if 'data' not in game_info and game_info['file_name'] in games_data:
+                game_info['data'] = games_data[game_info['file_name']]
+
     def _load_game_data(self, filename):
         """Загрузить данные конкретной игры"""
         try:
@@ -340,51 +537,35 @@ class BasketballChampionshipBot:
         except:
             return None
 
-    def has_games_without_stats(self, league=None):
+    async def has_games_without_stats(self, league=None):
         """Быстрая проверка наличия игр без статистики"""
         try:
-            # Получаем игры со статистикой из кэша
-            games_with_stats = self.get_games_with_statistics()
-            
-            # Получаем все номера игр из папки games
-            all_game_numbers = set()
-            for filename in os.listdir(GAMES_DIR_PATH) if os.path.exists(GAMES_DIR_PATH) else []:
-                if filename.startswith("game_") and filename.endswith(".json"):
-                    game_number = self.github_manager.extract_game_number(filename)
-                    if game_number:
-                        all_game_numbers.add(game_number)
-            
-            # Быстро проверяем, есть ли игры без статистики
-            for game_number in all_game_numbers:
-                if game_number not in games_with_stats:
-                    return True
-            return False
+            # Номера игр берутся из индекса - он не зависит от раскладки архива
+            games_index = await self.get_games_index_cached()
+            return any(
+                not row["has_stats"] and (not league or row["league"] == league)
+                for row in games_index["games"]
+            )
         except:
             return False
 
-    def get_all_games_without_stats(self):
+    async def get_all_games_without_stats(self):
         """Получить все игры без статистики (без фильтрации по лигам)"""
         cache_key = 'all_games_no_stats'
         
-        # Проверяем кэш (актуален в течение 30 секунд)
+        # Проверяем кэш (сбрасывается при изменении данных, без отслеживания изменений - через 30 секунд)
         current_time = time.time()
-        if (cache_key in self._games_without_stats_cache and 
-            current_time - self._games_without_stats_cache_timestamp.get(cache_key, 0) < 30):
+        if (await self._cache_is_fresh(self._games_without_stats_cache_timestamp.get(cache_key, 0), 30) and
+                cache_key in self._games_without_stats_cache):
             return self._games_without_stats_cache[cache_key]
         
-        # Получаем игры со статистикой из кэша
-        games_with_stats = self.get_games_with_statistics()
-        
-        # Получаем все игры из кэша
-        all_games = self.get_all_games_cached()
-        games_without_stats = []
-        
-        for game in all_games:
-            game_number = self.github_manager.extract_game_number(game['file_name'])
-            if game_number not in games_with_stats:
-                # Добавляем номер игры в объект для быстрого доступа
-                game['game_number'] = game_number
-                games_without_stats.append(game)
+        # Строим список по индексу игр, без загрузки файлов
+        games_index = await self.get_games_index_cached()
+        games_without_stats = [
+            row_to_game_info(row, game_file_path(row["number"]))
+            for row in games_index["games"]
+            if not row["has_stats"]
+        ]
         
         # Сортируем по номеру игры (по убыванию - самые новые первые)
         games_without_stats.sort(key=lambda x: x['game_number'], reverse=True)
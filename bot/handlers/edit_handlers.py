@@ -125,20 +125,22 @@ class EditHandlers:
             await query.edit_message_text("❌ Ошибка: матч не найден!")
             return
         
-        # Обновляем зал в расписании
-        success = self.update_match_in_schedule(
-            match, 
-            new_location=new_venue
-        )
+        user = query.from_user
+        username = parse_user_info(user)
         
-        if success:
-            user = query.from_user
-            username = parse_user_info(user)
-            
-            # Сохраняем изменения
-            commit_message = f"Изменен зал матча: {match['teamHome']} vs {match['teamAway']} | Новый зал: {new_venue} | Изменил: {username}"
-            save_success = self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
+        async with self.bot.data_lock:
+            # Обновляем зал в расписании
+            success = self.update_match_in_schedule(
+                match, 
+                new_location=new_venue
+            )
             
+            if success:
+                # Сохраняем изменения
+                commit_message = f"Изменен зал матча: {match['teamHome']} vs {match['teamAway']} | Новый зал: {new_venue} | Изменил: {username}"
+                save_success = await self.bot.github_manager.save_schedule_deferred(self.bot.schedule_data, commit_message)
+        
+        if success:
             if save_success:
                 await query.edit_message_text(
                     f"✅ Зал успешно изменен!\n\n"
@@ -213,18 +215,20 @@ class EditHandlers:
                     )
                     return
             
-            # Обновляем дату и время в расписании
-            success = self.update_match_in_schedule(
-                match, 
-                new_date=new_date_str,
-                new_time=new_time_str
-            )
+            async with self.bot.data_lock:
+                # Обновляем дату и время в расписании
+                success = self.update_match_in_schedule(
+                    match, 
+                    new_date=new_date_str,
+                    new_time=new_time_str
+                )
+                
+                if success:
+                    # Сохраняем изменения
+                    commit_message = f"Изменена дата матча: {match['teamHome']} vs {match['teamAway']} | Новая дата: {new_date_str} {new_time_str} | Изменил: {username}"
+                    save_success = await self.bot.github_manager.save_schedule_deferred(self.bot.schedule_data, commit_message)
             
             if success:
-                # Сохраняем изменения
-                commit_message = f"Изменена дата матча: {match['teamHome']} vs {match['teamAway']} | Новая дата: {new_date_str} {new_time_str} | Изменил: {username}"
-                save_success = self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
-                
                 if save_success:
                     await update.message.reply_text(
                         f"✅ Дата и время успешно изменены!\n\n"
@@ -258,23 +262,15 @@ class EditHandlers:
     def update_match_in_schedule(self, match_to_update, new_date=None, new_time=None, new_location=None):
         """Обновить матч в расписании"""
         try:
-            for stage in self.bot.schedule_data.get("stages", []):
-                for game in stage.get("games", []):
-                    if (game.get("teamHome") == match_to_update["teamHome"] and 
-                        game.get("teamAway") == match_to_update["teamAway"] and 
-                        game.get("date") == match_to_update["date"] and 
-                        game.get("time") == match_to_update["time"]):
-                        
-                        # Обновляем поля
-                        if new_date:
-                            game["date"] = new_date
-                        if new_time:
-                            game["time"] = new_time
-                        if new_location:
-                            game["location"] = new_location
-                        
-                        return True
-            return False
+            fields = {}
+            if new_date:
+                fields["date"] = new_date
+            if new_time:
+                fields["time"] = new_time
+            if new_location:
+                fields["location"] = new_location
+            
+            return self.bot.get_schedule_model().update_match(match_to_update, **fields)
         except Exception as e:
             logger.error(f"Ошибка при обновлении матча: {e}")
             return False
@@ -287,20 +283,14 @@ class EditHandlers:
             if 0 <= match_index < len(all_matches):
                 match_to_delete = all_matches[match_index]
                 
-                # Удаляем матч из структуры данных
-                for stage in self.bot.schedule_data.get("stages", []):
-                    stage["games"] = [game for game in stage.get("games", []) 
-                                    if not (game.get("teamHome") == match_to_delete["teamHome"] and 
-                                           game.get("teamAway") == match_to_delete["teamAway"] and 
-                                           game.get("date") == match_to_delete["date"] and 
-                                           game.get("time") == match_to_delete["time"])]
-                
-                # Сохраняем изменения
                 user = query.from_user
                 username = parse_user_info(user)
-                
                 commit_message = f"Удален матч: {match_to_delete['teamHome']} vs {match_to_delete['teamAway']} | Удалил: {username}"
-                success = self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
+                
+                async with self.bot.data_lock:
+                    # Удаляем матч из структуры данных и сохраняем изменения
+                    self.bot.get_schedule_model().remove_match(match_to_delete)
+                    success = await self.bot.github_manager.save_schedule_deferred(self.bot.schedule_data, commit_message)
                 
                 if success:
                     await query.edit_message_text(f"✅ Матч удален!")
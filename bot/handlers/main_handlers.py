@@ -13,7 +13,7 @@ class MainHandlers:
         # Сбрасываем все состояния пользователя
         self._clear_user_states(context)
         
-        success = self.bot.load_data_from_github()
+        success = await self.bot.load_data_from_github()
         
         if success:
             status_msg = "✅ Данные успешно загружены!"
@@ -34,13 +34,14 @@ class MainHandlers:
         pending_matches_count = len(self.bot.pending_matches)
         pending_results_count = len(self.bot.pending_results)
         
-        all_matches = self.bot.get_all_matches()
+        schedule_model = self.bot.get_schedule_model()
         
         keyboard = [
             [InlineKeyboardButton("📅 Добавить матч", callback_data="select_league")],
             [InlineKeyboardButton("🏀 Внести результат", callback_data="add_result")],
             [InlineKeyboardButton("📊 Управление статистикой", callback_data="stats_menu")],
             [InlineKeyboardButton("📋 Показать расписание", callback_data="show_schedule_menu")],
+            [InlineKeyboardButton("📈 Таблица", callback_data="standings_menu")],
             [InlineKeyboardButton("🏆 Управление лигами", callback_data="league_management")],
             [InlineKeyboardButton("🏟️ Список залов", callback_data="show_venues")],
         ]
@@ -52,11 +53,8 @@ class MainHandlers:
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        total_matches = len(all_matches)
-        matches_by_league = {}
-        for match in all_matches:
-            league = match['league']
-            matches_by_league[league] = matches_by_league.get(league, 0) + 1
+        matches_by_league = schedule_model.league_counts()
+        total_matches = sum(matches_by_league.values())
         
         text = (
             "🏀 Добро пожаловать в бот чемпионата по баскетболу!\n\n"
@@ -93,7 +91,7 @@ class MainHandlers:
         # Сбрасываем все состояния пользователя
         self._clear_user_states(context)
         
-        success = self.bot.load_data_from_github()
+        success = await self.bot.load_data_from_github()
         if success:
             status_msg = "✅ Данные обновлены!"
             if not self.bot.github_manager.github_available:
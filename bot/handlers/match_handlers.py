@@ -2,7 +2,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from datetime import datetime
 import logging
-from utils.helpers import parse_user_info, get_next_weekend_dates, get_available_times_for_venue, format_date_for_display
+from utils.helpers import parse_user_info, get_next_weekend_dates, format_date_for_display
 
 logger = logging.getLogger(__name__)
 
@@ -153,7 +153,7 @@ class MatchHandlers:
         venue = context.user_data['venue']
         
         # Получаем доступные времена для этого зала и даты
-        available_times = get_available_times_for_venue(venue, selected_date, self.bot.schedule_data)
+        available_times = self.bot.get_available_times(venue, selected_date)
         
         formatted_date = format_date_for_display(selected_date)
         
@@ -175,7 +175,7 @@ class MatchHandlers:
             row = []
             for i, time_slot in enumerate(available_times):
                 if time_slot.startswith("⏰"):
-                    # Это специальное предложение "через 1.5ч"
+                    # Это специальное предложение "сразу после игры"
                     callback_time = time_slot.split("(")[1].replace(")", "")
                     row.append(InlineKeyboardButton(time_slot, callback_data=f"quick_time_{callback_time}"))
                 else:
@@ -206,7 +206,7 @@ class MatchHandlers:
         user = query.from_user
         username = parse_user_info(user)
         
-        game_type = self.bot.determine_game_type(league, team1, team2, selected_date)
+        game_type = await self.bot.determine_game_type(league, team1, team2, selected_date)
 
         # Создание записи о матче
         match_data = {
@@ -305,7 +305,7 @@ class MatchHandlers:
             team2 = context.user_data['team2']
             league = context.user_data['current_league']
             
-            game_type = self.bot.determine_game_type(league, team1, team2, selected_date)
+            game_type = await self.bot.determine_game_type(league, team1, team2, selected_date)
             
             # Создание записи о матче
             match_data = {
@@ -397,7 +397,7 @@ class MatchHandlers:
             team2 = context.user_data['team2']
             
             # ОПРЕДЕЛЯЕМ ТИП ИГРЫ
-            game_type = self.bot.determine_game_type(league, team1, team2, date_str)
+            game_type = await self.bot.determine_game_type(league, team1, team2, date_str)
             
             # Создание записи о матче в формате schedule.json
             match_data = {
@@ -2,7 +2,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from datetime import datetime
 import logging
-from utils.helpers import parse_user_info, validate_score_input, convert_to_timestamp
+from utils.helpers import parse_user_info, validate_score_input
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +12,9 @@ class ResultHandlers:
     
     async def show_matches_for_result(self, query, context):
         """Показать матчи для внесения результата"""
-        all_matches = self.bot.get_all_matches()
+        schedule_model = self.bot.get_schedule_model()
         
-        if not all_matches:
+        if not schedule_model.matches():
             keyboard = [[InlineKeyboardButton("🔙 Назад", callback_data="back_to_menu")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
             await query.edit_message_text(
@@ -25,12 +25,7 @@ class ResultHandlers:
         
         # Показываем только матчи, которые уже прошли
         current_time = datetime.now()
-        available_matches = []
-        
-        for match in all_matches:
-            match_time = convert_to_timestamp(match['date'], match['time'])
-            if match_time < current_time.timestamp():
-                available_matches.append(match)
+        available_matches = schedule_model.matches_before(current_time.timestamp())
         
         if not available_matches:
             keyboard = [[InlineKeyboardButton("🔙 Назад", callback_data="back_to_menu")]]
@@ -32,13 +32,8 @@ class ScheduleHandlers:
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        all_matches = self.bot.get_all_matches()
-        total_matches = len(all_matches)
-        matches_by_league = {}
-        
-        for match in all_matches:
-            league = match['league']
-            matches_by_league[league] = matches_by_league.get(league, 0) + 1
+        matches_by_league = self.bot.get_schedule_model().league_counts()
+        total_matches = sum(matches_by_league.values())
         
         schedule_text = "📊 Статистика расписания:\n"
         schedule_text += f"• Всего матчей: {total_matches}\n"
@@ -102,8 +97,7 @@ class ScheduleHandlers:
     
     async def show_league_schedule(self, query, context, league_name):
         """Показать расписание конкретной лиги"""
-        all_matches = self.bot.get_all_matches()
-        league_matches = [match for match in all_matches if match['league'] == league_name]
+        league_matches = self.bot.get_schedule_model().matches_for_league(league_name)
         
         if not league_matches:
             keyboard = [
@@ -0,0 +1,63 @@
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+import logging
+from storage.standings import league_table
+
+logger = logging.getLogger(__name__)
+
+class StandingsHandlers:
+    def __init__(self, bot_instance):
+        self.bot = bot_instance
+
+    async def show_standings_menu(self, query, context):
+        """Показать выбор лиги для турнирной таблицы"""
+        if not self.bot.leagues:
+            keyboard = [[InlineKeyboardButton("🔄 Обновить данные", callback_data="refresh_data")]]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(
+                "❌ Нет данных о лигах. Попробуйте обновить данные.",
+                reply_markup=reply_markup
+            )
+            return
+
+        keyboard = []
+        for league_name in self.bot.leagues.keys():
+            keyboard.append([InlineKeyboardButton(f"📈 {league_name}", callback_data=f"standings_{league_name}")])
+
+        keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="back_to_menu")])
+        reply_markup = InlineKeyboardMarkup(keyboard)
+
+        await query.edit_message_text(
+            "📈 Турнирная таблица (регулярный сезон)\n\nВыберите лигу:",
+            reply_markup=reply_markup
+        )
+
+    async def show_league_standings(self, query, context, league_name):
+        """Показать турнирную таблицу лиги"""
+        standings = await self.bot.get_standings_cached()
+        teams = self.bot.leagues.get(league_name, {}).get('teams', [])
+        rows = league_table(standings, league_name, teams)
+
+        keyboard = [
+            [InlineKeyboardButton("🔙 Назад", callback_data="standings_menu")],
+            [InlineKeyboardButton("🏠 Главное меню", callback_data="back_to_menu")]
+        ]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+
+        if not rows:
+            await query.edit_message_text(
+                f"📈 В лиге '{league_name}' пока нет команд и результатов.",
+                reply_markup=reply_markup
+            )
+            return
+
+        text = f"📈 Таблица лиги '{league_name}':\n\n"
+        for place, row in enumerate(rows, 1):
+            text += (
+                f"{place}. {row['team']} - {row['points']} очк.\n"
+                f"   И {row['played']} | В {row['wins']} | П {row['losses']} | "
+                f"{row['points_for']}:{row['points_against']} ({row['diff']:+d})\n"
+            )
+        text += "\nИ - игры, В - победы, П - поражения. Победа - 2 очка, поражение - 1."
+
+        await query.edit_message_text(text, reply_markup=reply_markup)
@@ -1,18 +1,25 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+import asyncio
 import logging
+from config import STATS_IMAGE_UPLOAD_CONCURRENCY
+from storage.games_index import stats_image_name
 from utils.helpers import parse_user_info
+from utils.image_processing import ImageProcessor
 
 logger = logging.getLogger(__name__)
 
 class StatsHandlers:
     def __init__(self, bot_instance):
         self.bot = bot_instance
+        # Одновременно в памяти не больше N загружаемых изображений
+        self._image_upload_semaphore = asyncio.Semaphore(STATS_IMAGE_UPLOAD_CONCURRENCY)
+        self.image_processor = ImageProcessor()
     
     async def show_stats_menu(self, query, context):
         """Показать меню управления статистикой"""
         # Получаем все игры без статистики
-        games_without_stats = self.bot.get_all_games_without_stats()
+        games_without_stats = await self.bot.get_all_games_without_stats()
         
         if not games_without_stats:
             keyboard = [
@@ -70,7 +77,7 @@ class StatsHandlers:
         context.user_data['selected_game_for_stats'] = game_number
         
         # Получаем полную информацию об игре
-        game_info = self.bot.get_game_by_number_cached(game_number)
+        game_info = await self.bot.get_game_by_number_cached(game_number)
         
         if not game_info:
             await query.edit_message_text("❌ Ошибка: игра не найдена!")
@@ -97,7 +104,7 @@ class StatsHandlers:
             f"🔢 Номер игры: {game_number:03d}\n\n"
             "📎 Пожалуйста, отправьте изображение со статистикой.\n"
             "Поддерживаемые форматы: JPG, PNG.\n"
-            "Изображение будет сохранено как game_{:03d}.jpg".format(game_number)
+            "Изображение будет сохранено как {}".format(stats_image_name(game_number))
         )
         
         context.user_data['waiting_for_stats_image'] = True
@@ -116,16 +123,6 @@ class StatsHandlers:
                 )
                 return
             
-            # Получаем самое большое изображение
-            photo = update.message.photo[-1]
-            file_id = photo.file_id
-            
-            # Получаем файл
-            file = await context.bot.get_file(file_id)
-            
-            # Скачиваем изображение
-            image_data = await file.download_as_bytearray()
-            
             # Получаем номер игры
             game_number = context.user_data.get('selected_game_for_stats')
             if not game_number:
@@ -133,7 +130,7 @@ class StatsHandlers:
                 return
             
             # Получаем информацию об игре
-            game_info = self.bot.get_game_by_number_cached(game_number)
+            game_info = await self.bot.get_game_by_number_cached(game_number)
             if not game_info:
                 await update.message.reply_text("❌ Ошибка: данные игры не найдены!")
                 return
@@ -150,13 +147,45 @@ class StatsHandlers:
             
             # Сохраняем изображение
             commit_message = f"Добавлена статистика для игры {game_number:03d}: {team_a} vs {team_b} | Добавил: {username}"
-            success = self.bot.github_manager.save_statistics_image(
-                bytes(image_data),
-                game_number,
-                commit_message
-            )
-            
-            if success:
+            async with self._image_upload_semaphore:
+                # Получаем самое большое изображение
+                photo = update.message.photo[-1]
+                file = await context.bot.get_file(photo.file_id)
+                
+                # Скачиваем изображение и нормализуем его в пуле процессов
+                image_data = await file.download_as_bytearray()
+                processed = await self.image_processor.normalize(image_data)
+                if processed is not None:
+                    image_data, thumbnail, image_phash = processed
+                    duplicate_of = await self.bot.github_manager.find_duplicate_statistics_image(image_data, image_phash)
+                    if duplicate_of is None:
+                        success = await self.bot.github_manager.save_statistics_image(
+                            image_data,
+                            game_number,
+                            commit_message,
+                            thumbnail,
+                            image_phash
+                        )
+            
+            if processed is None:
+                # Ожидание изображения не сбрасывается - его можно отправить ещё раз
+                await update.message.reply_text(
+                    "❌ Не удалось обработать изображение!\n"
+                    "Отправьте его ещё раз."
+                )
+                return
+
+            if duplicate_of is not None:
+                if duplicate_of == game_number:
+                    duplicate_info = "для этой игры"
+                else:
+                    duplicate_info = f"для игры {duplicate_of:03d}"
+                await update.message.reply_text(
+                    f"⚠️ Это изображение уже сохранено {duplicate_info}!\n\n"
+                    f"📁 Файл: {stats_image_name(duplicate_of)}\n"
+                    "Повторная загрузка пропущена."
+                )
+            elif success:
                 storage_info = "локально" if not self.bot.github_manager.github_available else "в GitHub"
                 
                 # Обновляем кэш после добавления статистики
@@ -166,7 +195,7 @@ class StatsHandlers:
                     f"✅ Статистика успешно добавлена и сохранена {storage_info}!\n\n"
                     f"🏀 Игра: {team_a} vs {team_b}\n"
                     f"🔢 Номер: {game_number:03d}\n"
-                    f"📁 Файл: game_{game_number:03d}.jpg"
+                    f"📁 Файл: {stats_image_name(game_number)}"
                 )
             else:
                 await update.message.reply_text(
@@ -196,6 +225,7 @@ class StatsHandlers:
         self.bot._games_without_stats_cache_timestamp = {}
         self.bot._games_cache = None
         self.bot._games_with_stats_cache = None
+        self.bot._games_index_cache = None
         
         # Показываем обновленный список
         await self.show_stats_menu(query, context)
\ No newline at end of file
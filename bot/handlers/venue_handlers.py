@@ -72,7 +72,7 @@ class VenueHandlers:
             
             # Сохраняем изменения
             commit_message = f"Добавлен зал: {venue_name} | Добавил: {username}"
-            success = self.bot.github_manager.save_venues_data(self.bot.venues, commit_message)
+            success = await self.bot.github_manager.save_venues_data(self.bot.get_venues_data(), commit_message)
             
             if success:
                 storage_info = "локально" if not self.bot.github_manager.github_available else "в GitHub"
@@ -132,14 +132,8 @@ class VenueHandlers:
             venue_to_delete = self.bot.venues[venue_index]
             
             # Проверяем, используется ли зал в расписании
-            used_in_schedule = False
-            schedule_matches = []
-            
-            all_matches = self.bot.get_all_matches()
-            for match in all_matches:
-                if match['location'] == venue_to_delete:
-                    used_in_schedule = True
-                    schedule_matches.append(match)
+            schedule_matches = self.bot.get_schedule_model().matches_at_venue(venue_to_delete)
+            used_in_schedule = bool(schedule_matches)
             
             if used_in_schedule:
                 # Показываем предупреждение и список матчей
@@ -169,14 +163,15 @@ class VenueHandlers:
                 await query.edit_message_text(warning_text, reply_markup=reply_markup)
                 return
             
-            # Удаляем зал из списка
+            # Удаляем зал из списка (вместе с настройками)
             self.bot.venues.pop(venue_index)
+            self.bot.venue_entries.pop(venue_to_delete, None)
             
             # Сохраняем изменения
             user = query.from_user
             username = parse_user_info(user)
             commit_message = f"Удален зал: {venue_to_delete} | Удалил: {username}"
-            success = self.bot.github_manager.save_venues_data(self.bot.venues, commit_message)
+            success = await self.bot.github_manager.save_venues_data(self.bot.get_venues_data(), commit_message)
             
             if not success:
                 await query.edit_message_text("❌ Ошибка при сохранении!")
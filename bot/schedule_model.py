@@ -0,0 +1,142 @@
+import bisect
+from utils.helpers import convert_to_timestamp
+
+# Модель расписания для отображения: плоский список матчей, отсортированный
+# по времени, и вторичные индексы по лиге, команде, залу, дате и залу на дату.
+# Строится один раз на версию данных (объект schedule_data, состав лиг и версия
+# данных хранилища - слияние с репозиторием меняет schedule_data на месте), правки
+# бота (добавление, изменение, удаление) применяются к модели на месте.
+# Записи матчей общие для всех просмотров - вызывающий код их не изменяет.
+
+
+def match_key(match):
+    """Ключ, по которому обработчики находят игру расписания: хозяева, гости, дата, время"""
+    return (match.get("teamHome"), match.get("teamAway"), match.get("date"), match.get("time"))
+
+
+def _sort_key(match):
+    return match["timestamp"], match["_order"]
+
+
+class ScheduleModel:
+    """Материализованное расписание с индексами по лиге, команде, залу и дате"""
+
+    def __init__(self, schedule_data, leagues, find_league, data_version=0):
+        self.schedule_data = schedule_data
+        self.leagues = leagues
+        self.data_version = data_version
+        self._find_league = find_league
+        self._order = 0
+        self._matches = []
+        self._games = {}  # id(запись) -> (этап, игра в schedule_data)
+        self._by_key = {}
+        self._by_league = {}
+        self._by_team = {}
+        self._by_venue = {}
+        self._by_date = {}
+        self._by_venue_date = {}
+        for stage in schedule_data.get("stages", []):
+            for game in stage.get("games", []):
+                self._index(stage, game)
+
+    def is_built_from(self, schedule_data, leagues, data_version=0):
+        return (self.schedule_data is schedule_data and self.leagues is leagues and
+                self.data_version == data_version)
+
+    def _make_match(self, stage, game):
+        self._order += 1
+        return {
+            'stage': stage.get('name', 'Неизвестный этап'),
+            'league': self._find_league(game.get("teamHome"), game.get("teamAway")),
+            'teamHome': game.get('teamHome'),
+            'teamAway': game.get('teamAway'),
+            'date': game.get('date'),
+            'time': game.get('time'),
+            'location': game.get('location'),
+            'datetime': f"{game.get('date')} {game.get('time')}",
+            'timestamp': convert_to_timestamp(game.get('date'), game.get('time')),
+            # Порядок в файле - для стабильной сортировки матчей с одинаковым временем
+            '_order': self._order,
+        }
+
+    def _indexes(self, match):
+        yield self._matches
+        yield self._by_key.setdefault(match_key(match), [])
+        yield self._by_league.setdefault(match['league'], [])
+        yield self._by_date.setdefault(match['date'], [])
+        yield self._by_venue.setdefault(match['location'], [])
+        yield self._by_venue_date.setdefault((match['location'], match['date']), [])
+        for team in {match['teamHome'], match['teamAway']}:
+            yield self._by_team.setdefault(team, [])
+
+    def _index(self, stage, game):
+        match = self._make_match(stage, game)
+        self._games[id(match)] = (stage, game)
+        for matches in self._indexes(match):
+            bisect.insort(matches, match, key=_sort_key)
+        return match
+
+    def _unindex(self, match):
+        del self._games[id(match)]
+        for matches in self._indexes(match):
+            position = bisect.bisect_left(matches, _sort_key(match), key=_sort_key)
+            while matches[position] is not match:
+                position += 1
+            del matches[position]
+
+    def matches(self):
+        """Все матчи, отсортированные по времени"""
+        return list(self._matches)
+
+    def matches_for_league(self, league):
+        return list(self._by_league.get(league, []))
+
+    def matches_for_team(self, team):
+        return list(self._by_team.get(team, []))
+
+    def matches_at_venue(self, venue):
+        return list(self._by_venue.get(venue, []))
+
+    def matches_on_date(self, date):
+        return list(self._by_date.get(date, []))
+
+    def matches_at_venue_on(self, venue, date):
+        """Матчи в зале на дату (по времени начала)"""
+        return list(self._by_venue_date.get((venue, date), []))
+
+    def matches_before(self, timestamp):
+        """Матчи, начавшиеся раньше timestamp"""
+        return self._matches[:bisect.bisect_left(self._matches, timestamp, key=lambda m: m["timestamp"])]
+
+    def league_counts(self):
+        """{лига: количество матчей}"""
+        return {league: len(matches) for league, matches in self._by_league.items() if matches}
+
+    def add_game(self, stage_name, game):
+        """Добавить игру в этап schedule_data (этап создаётся при необходимости)"""
+        stages = self.schedule_data.setdefault("stages", [])
+        stage = next((stage for stage in stages if stage.get("name") == stage_name), None)
+        if stage is None:
+            stage = {"name": stage_name, "games": []}
+            stages.append(stage)
+        stage.setdefault("games", []).append(game)
+        return self._index(stage, game)
+
+    def update_match(self, match, **fields):
+        """Изменить поля игр с ключом матча. Возвращает True, если игра найдена"""
+        found = list(self._by_key.get(match_key(match), []))
+        for old_match in found:
+            stage, game = self._games[id(old_match)]
+            self._unindex(old_match)
+            game.update(fields)
+            self._index(stage, game)
+        return bool(found)
+
+    def remove_match(self, match):
+        """Удалить из schedule_data все игры с ключом матча. Возвращает True, если игра найдена"""
+        found = list(self._by_key.get(match_key(match), []))
+        for old_match in found:
+            stage, game = self._games[id(old_match)]
+            self._unindex(old_match)
+            stage["games"] = [stage_game for stage_game in stage["games"] if stage_game is not game]
+        return bool(found)
@@ -0,0 +1,88 @@
+import bisect
+from config import VENUE_CLOSING_TIME, VENUE_GAME_DURATION, VENUE_OPENING_TIME
+
+# Календарь занятости залов. В venues.json зал записывается строкой (название)
+# или объектом с настройками:
+#   {"name": "Манеж УлГПУ", "gameDuration": 90,
+#    "openingHours": {"from": "09:00", "to": "22:30"}, "blackoutDates": ["2025-12-31"]}
+# Игра занимает зал на gameDuration минут от начала и должна закончиться до
+# закрытия. Занятые интервалы зала на дату берутся из индекса модели
+# расписания (отсортированы по началу), поэтому проверка слота - бинарный поиск.
+
+
+def to_minutes(time_str):
+    """"18:30" -> 1110"""
+    hours, minutes = time_str.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def venue_settings(entry=None):
+    """Настройки зала из записи venues.json (строка или объект) со значениями по умолчанию"""
+    entry = entry if isinstance(entry, dict) else {}
+    opening_hours = entry.get("openingHours", {})
+    return {
+        "gameDuration": entry.get("gameDuration", VENUE_GAME_DURATION),
+        "openingHours": {
+            "from": opening_hours.get("from", VENUE_OPENING_TIME),
+            "to": opening_hours.get("to", VENUE_CLOSING_TIME),
+        },
+        "blackoutDates": list(entry.get("blackoutDates", [])),
+    }
+
+
+def parse_venues(venues_data):
+    """venues.json -> (названия залов, {название: запись-объект})"""
+    names, entries = [], {}
+    for entry in venues_data:
+        if isinstance(entry, dict):
+            names.append(entry["name"])
+            entries[entry["name"]] = entry
+        else:
+            names.append(entry)
+    return names, entries
+
+
+def serialize_venues(names, entries):
+    """Обратно в формат venues.json: залы без настроек остаются строками"""
+    return [entries.get(name, name) for name in names]
+
+
+def is_free(busy_starts, start, duration):
+    """Свободен ли интервал [start, start + duration) при играх, начинающихся в busy_starts.
+
+    У всех игр зала одна длительность, поэтому пересекаются только игры,
+    начинающиеся в интервале (start - duration, start + duration).
+    """
+    position = bisect.bisect_right(busy_starts, start - duration)
+    return position == len(busy_starts) or busy_starts[position] >= start + duration
+
+
+def available_times(settings, date, busy_starts):
+    """Свободное время начала игры в зале на дату.
+
+    Сетка слотов идёт от открытия с шагом в длительность игры; дополнительно
+    предлагается время сразу после каждой игры, если оно не попадает в сетку.
+    busy_starts - отсортированные минуты начала уже назначенных игр.
+    """
+    if date in settings["blackoutDates"]:
+        return []
+
+    duration = settings["gameDuration"]
+    opening = to_minutes(settings["openingHours"]["from"])
+    last_start = to_minutes(settings["openingHours"]["to"]) - duration
+
+    grid = range(opening, last_start + 1, duration)
+    times = [format_minutes(start) for start in grid if is_free(busy_starts, start, duration)]
+
+    for busy_start in busy_starts:
+        start = busy_start + duration
+        if opening <= start <= last_start and start not in grid and is_free(busy_starts, start, duration):
+            label = f"⏰ После игры ({format_minutes(start)})"
+            if label not in times:
+                times.append(label)
+
+    return sorted(times, key=lambda label: label[-6:-1] if label.startswith("⏰") else label)
@@ -10,14 +10,70 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_REPO_OWNER = os.getenv("GITHUB_REPO_OWNER")
 GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH")  # по умолчанию - основная ветка репозитория
+
+# Хранилище данных: github, filesystem или sqlite (по умолчанию GitHub, если он настроен)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND")
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/championship.db")
+
+# Настройки HTTP-клиента GitHub
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_CONNECT_TIMEOUT = 5.0
+GITHUB_READ_TIMEOUT = 20.0
+GITHUB_MAX_CONNECTIONS = 10
+GITHUB_RATE_LIMIT_RESERVE = 100  # остаток лимита, который не тратится на фоновую запись
+GITHUB_MAX_WRITE_DEFER = 300  # дольше (с) фоновая запись не ждёт лимит - сохраняется локально
+GITHUB_CACHE_FILE = ".cache/github_responses.json"
+GITHUB_CACHE_MAX_ENTRIES = 500  # ответов в кэше условных запросов (вытесняются давно не использованные)
+GAMES_SNAPSHOT_FILE = ".cache/games_snapshot.json"
+GAMES_FETCH_CONCURRENCY = 8  # файлов игр, загружаемых одновременно по одному
+GAMES_FETCH_TIMEOUT = 15.0  # секунд на загрузку одного файла игры
+# Наблюдать за локальным архивом игр через inotify (нужен пакет inotify_simple)
+LOCAL_ARCHIVE_WATCH = os.getenv("LOCAL_ARCHIVE_WATCH") == "1"
+
+# Сколько изображений статистики может загружаться одновременно
+STATS_IMAGE_UPLOAD_CONCURRENCY = 2
+
+# Обработка изображений статистики перед сохранением
+STATS_IMAGE_FORMAT = os.getenv("STATS_IMAGE_FORMAT", "JPEG")  # JPEG или WEBP
+STATS_IMAGE_MAX_SIDE = 2048  # максимальный размер большей стороны, пикселей
+STATS_IMAGE_QUALITY = 85
+STATS_THUMBNAIL_SIDE = 320
+STATS_IMAGE_WORKERS = 2  # процессов в пуле обработки
+# Порог расстояния Хэмминга для поиска похожих изображений; None - только точное совпадение
+STATS_IMAGE_PHASH_DISTANCE = None
+
+# Отложенная запись расписания: правки за это число секунд попадают в один коммит (0 - сразу)
+SCHEDULE_WRITE_BEHIND_DELAY = float(os.getenv("SCHEDULE_WRITE_BEHIND_DELAY", "0"))
+
+# Залы по умолчанию (переопределяются для зала в venues.json): длительность игры (мин) и часы работы
+VENUE_GAME_DURATION = 90
+VENUE_OPENING_TIME = "09:00"
+VENUE_CLOSING_TIME = "22:30"
+
+# Как часто (с) проверять, изменились ли данные в хранилище, прежде чем доверять кэшам
+CHANGE_CHECK_INTERVAL = 5
+
+# Webhook push из GitHub: изменения приходят сразу, опрос остаётся редкой страховкой
+GITHUB_WEBHOOK_PORT = int(os.getenv("GITHUB_WEBHOOK_PORT", "0"))  # 0 - эндпоинт выключен
+# По умолчанию только локальный интерфейс: снаружи webhook принимает обратный прокси
+GITHUB_WEBHOOK_HOST = os.getenv("GITHUB_WEBHOOK_HOST", "127.0.0.1")
+GITHUB_WEBHOOK_PATH = os.getenv("GITHUB_WEBHOOK_PATH", "/github-webhook")
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+WEBHOOK_CHANGE_CHECK_INTERVAL = 300
 
 # Пути к файлам
+DATA_DIR_PATH = "data"
 CONFIG_FILE_PATH = "data/leagues-config.json"
 TEAMS_FILE_PATH = "data/teams.json"
 VENUES_FILE_PATH = "data/venues.json"
 SCHEDULE_FILE_PATH = "data/schedule.json"
 GAMES_DIR_PATH = "data/games"
+GAMES_INDEX_PATH = "data/games/index.json"
+STANDINGS_FILE_PATH = "data/standings.json"
 RESULT_IMAGES_DIR = "data/result"
+RESULT_THUMBNAILS_DIR = "data/result/thumbnails"
+GAMES_SHARD_SIZE = 100  # игр в одной директории-блоке архива
 
 # Настройки логирования
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
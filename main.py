@@ -1,8 +1,14 @@
+import asyncio
+import copy
 import logging
+import time
 from telegram import Update
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from config import *
 from github_manager import GitHubManager
+from storage.github_client import GitHubConflictError
+from storage.games_index import make_index_row
+from storage.standings import add_game as add_standings_game
 from bot.basketball_bot import BasketballChampionshipBot
 from bot.handlers.main_handlers import MainHandlers
 from bot.handlers.match_handlers import MatchHandlers
@@ -12,6 +18,8 @@ from bot.handlers.venue_handlers import VenueHandlers
 from bot.handlers.league_handlers import LeagueHandlers
 from bot.handlers.edit_handlers import EditHandlers
 from bot.handlers.stats_handlers import StatsHandlers
+from bot.handlers.standings_handlers import StandingsHandlers
+from utils.github_webhook import GitHubWebhookReceiver
 from utils.helpers import convert_to_timestamp, parse_user_info, validate_score_input
 
 # Настройка логирования
@@ -36,8 +44,11 @@ class BotApplication:
         self.league_handlers = LeagueHandlers(self.bot)
         self.edit_handlers = EditHandlers(self.bot)
         self.stats_handlers = StatsHandlers(self.bot)
+        self.standings_handlers = StandingsHandlers(self.bot)
         
         self.application = None
+        self.startup_load = None
+        self.webhook_receiver = None
     
     async def handle_reset_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /reset для сброса состояний"""
@@ -48,11 +59,65 @@ class BotApplication:
         await update.message.reply_text("✅ Все состояния сброшены!")
         await main_handlers.show_main_menu(update, context)
 
+    async def handle_rebuild_index_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /rebuild_index - пересборка индекса игр по файлам"""
+        username = parse_user_info(update.message.from_user)
+        await update.message.reply_text("⏳ Пересборка индекса игр...")
+        
+        commit_message = f"Пересобран индекс игр | Обновил: {username}"
+        index = await self.bot.github_manager.rebuild_games_index(commit_message)
+        
+        if index is not None:
+            self.bot._games_index_cache = None
+            await update.message.reply_text(f"✅ Индекс игр пересобран: {len(index['games'])} игр")
+        else:
+            await update.message.reply_text("❌ Ошибка при пересборке индекса игр!")
+
+    async def handle_rebuild_standings_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /rebuild_standings - пересборка турнирной таблицы по индексу игр"""
+        username = parse_user_info(update.message.from_user)
+        await update.message.reply_text("⏳ Пересборка турнирной таблицы...")
+        
+        commit_message = f"Пересобрана турнирная таблица | Обновил: {username}"
+        standings = await self.bot.github_manager.rebuild_standings(commit_message)
+        
+        if standings is not None:
+            self.bot._standings_cache = None
+            await update.message.reply_text(f"✅ Турнирная таблица пересобрана: {len(standings['games'])} игр")
+        else:
+            await update.message.reply_text("❌ Ошибка при пересборке турнирной таблицы!")
+
+    async def handle_status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /status - состояние хранилища и лимита GitHub API"""
+        status = self.bot.github_manager.get_storage_status()
+        lines = [f"🗄 Хранилище: {status['backend']}"]
+        
+        if status.get('remaining') is not None:
+            reset_time = time.strftime('%H:%M', time.localtime(status['reset_at']))
+            lines.append(f"📉 Лимит API: {status['remaining']} из {status['limit']} (сброс в {reset_time})")
+        elif 'remaining' in status:
+            lines.append("📉 Лимит API: ещё не было запросов")
+        if status.get('blocked_until'):
+            blocked_time = time.strftime('%H:%M:%S', time.localtime(status['blocked_until']))
+            lines.append(f"⛔ Запросы приостановлены до {blocked_time}")
+        if 'active' in status:
+            lines.append(f"🔄 Выполняется запросов: {status['active']}")
+            lines.append(f"⏳ В очереди: чтение {status['queued_interactive']}, запись {status['queued_background']}")
+        if status['deferred_schedule_changes']:
+            lines.append(f"📝 Правок расписания ждут записи: {status['deferred_schedule_changes']}")
+        if 'cache_hits' in status:
+            lines.append(f"💾 Кэш ответов: {status['cache_hits']} попаданий, {status['cache_misses']} промахов")
+        
+        await update.message.reply_text("\n".join(lines))
+
     def setup_handlers(self):
         """Настройка всех обработчиков"""
         # Главное меню
         self.application.add_handler(CommandHandler("start", self.main_handlers.start))
         self.application.add_handler(CommandHandler("reset", self.handle_reset_command))
+        self.application.add_handler(CommandHandler("rebuild_index", self.handle_rebuild_index_command))
+        self.application.add_handler(CommandHandler("rebuild_standings", self.handle_rebuild_standings_command))
+        self.application.add_handler(CommandHandler("status", self.handle_status_command))
         self.application.add_handler(CallbackQueryHandler(self.handle_callback))
         
         # Обработчики сообщений
@@ -83,6 +148,12 @@ class BotApplication:
         elif data == "show_venues":
             await self.venue_handlers.show_venues_management(query, context)
         
+        elif data == "standings_menu":
+            await self.standings_handlers.show_standings_menu(query, context)
+        elif data.startswith("standings_"):
+            league_name = data.replace("standings_", "", 1)
+            await self.standings_handlers.show_league_standings(query, context, league_name)
+        
         elif data == "stats_menu":
             await self.stats_handlers.show_stats_menu(query, context)
         elif data == "stats_refresh":
@@ -246,33 +317,93 @@ class BotApplication:
             await main_handlers.show_main_menu(update, context)
     
     async def apply_pending_changes(self, query, context):
-        """Применить ожидающие изменения и сохранить в GitHub"""
+        """Применить ожидающие изменения и сохранить в GitHub одним коммитом"""
+        username = parse_user_info(query.from_user)
+        
+        # Одновременно изменения применяет только один пользователь
+        async with self.bot.data_lock:
+            result_text = await self._apply_pending_changes(username)
+        
+        await query.edit_message_text(result_text)
+        await self.main_handlers.show_main_menu(query, context, is_query=True)
+    
+    async def _apply_pending_changes(self, username):
+        """Применить ожидающие изменения (под data_lock). Возвращает текст для пользователя"""
         if not self.bot.pending_matches and not self.bot.pending_results:
-            await query.edit_message_text("❌ Нет ожидающих изменений!")
-            await self.main_handlers.show_main_menu(query, context, is_query=True)
-            return
+            return "❌ Нет ожидающих изменений!"
+        
+        # Забираем очереди: новые изменения других пользователей попадут в новые очереди,
+        # а забранные при неудаче вернутся обратно
+        pending_matches, self.bot.pending_matches = self.bot.pending_matches, []
+        pending_results, self.bot.pending_results = self.bot.pending_results, []
+        
+        # Снимок расписания для отката, если коммит не удастся
+        schedule_backup = copy.deepcopy(self.bot.schedule_data)
+        # Отложенные правки расписания войдут в этот же коммит
+        deferred_changes = self.bot.github_manager.take_deferred_schedule_changes()
         
-        user = query.from_user
-        username = parse_user_info(user)
+        success = False
+        for attempt in range(1, 4):
+            try:
+                # Турнирная таблица дополняется новыми результатами и входит в тот же коммит
+                standings = copy.deepcopy(await self.bot.get_standings_cached()) if pending_results else None
+                self.bot.github_manager.begin_batch()
+                commit_messages, commit_parts, all_saved = await self._stage_pending_changes(
+                    pending_matches, pending_results, standings
+                )
+                
+                # Сохраняем расписание и результаты одним коммитом
+                all_saved &= await self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, "")
+                commit_message = f"Применены изменения: {', '.join(commit_parts)} | Добавил: {username}"
+                if deferred_changes:
+                    commit_message += "\n\n" + "\n".join(f"- {change}" for change in deferred_changes)
+                success = await self.bot.github_manager.commit_batch(commit_message) and all_saved
+                break
+            except GitHubConflictError as e:
+                # Номера игр заняты параллельной записью (при сохранении или при коммите) - пересобираем пакет
+                logger.warning(f"Конфликт при применении изменений ({attempt}/3): {e}")
+                self.bot.github_manager.discard_batch()
+                self.bot.schedule_data = copy.deepcopy(schedule_backup)
+            except Exception as e:
+                logger.error(f"Ошибка при применении изменений: {e}")
+                self.bot.github_manager.discard_batch()
+                break
         
+        if success:
+            self.bot._games_index_cache = None  # Индекс обновлён тем же коммитом
+            if standings is not None:
+                self.bot._standings_cache = standings
+            self.bot.record_played_games(pending_results)
+            storage_info = " локально" if not self.bot.github_manager.github_available else ""
+            
+            return "✅ Изменения применены и сохранены{}!\n\n📊 Сохранено:\n{}".format(
+                storage_info,
+                "\n".join([f"• {msg}" for msg in commit_messages])
+            )
+        
+        # Откатываем изменения в случае ошибки: очереди и отложенные правки возвращаем
+        self.bot.schedule_data = schedule_backup
+        self.bot.pending_matches = pending_matches + self.bot.pending_matches
+        self.bot.pending_results = pending_results + self.bot.pending_results
+        for change in deferred_changes:
+            await self.bot.github_manager.save_schedule_deferred(self.bot.schedule_data, change)
+        return (
+            "❌ Ошибка при сохранении! Изменения не применены.\n"
+            "Попробуйте позже."
+        )
+    
+    async def _stage_pending_changes(self, pending_matches, pending_results, standings=None):
+        """Внести ожидающие матчи и результаты в расписание, турнирную таблицу и пакет коммита"""
         commit_messages = []
-        success_count = 0
+        commit_parts = []
+        all_saved = True
         
         # Обрабатываем ожидающие матчи
-        if self.bot.pending_matches:
-            # Находим этап "Регулярный сезон" или создаем его
-            regular_season = None
-            for stage in self.bot.schedule_data.get("stages", []):
-                if stage.get("name") == "Регулярный сезон":
-                    regular_season = stage
-                    break
-            
-            if not regular_season:
-                regular_season = {"name": "Регулярный сезон", "games": []}
-                self.bot.schedule_data["stages"].append(regular_season)
+        if pending_matches:
+            schedule_model = self.bot.get_schedule_model()
             
-            # Добавляем ожидающие матчи в расписание
-            for match in self.bot.pending_matches:
+            # Добавляем ожидающие матчи в этап "Регулярный сезон" (создается при необходимости)
+            for match in pending_matches:
                 game_data = {
                     "date": match['date'],
                     "time": match['time'],
@@ -282,75 +413,47 @@ class BotApplication:
                     "league": match['league'],
                     "gameType": match['gameType']
                 }
-                regular_season["games"].append(game_data)
+                schedule_model.add_game("Регулярный сезон", game_data)
             
             # Сортируем игры по дате
-            regular_season["games"].sort(key=lambda x: convert_to_timestamp(x['date'], x['time']))
-            
-            # Сохраняем расписание
-            commit_message = f"Добавлено {len(self.bot.pending_matches)} матчей | Добавил: {username}"
-            success = self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
+            for stage in self.bot.schedule_data["stages"]:
+                if stage.get("name") == "Регулярный сезон":
+                    stage["games"].sort(key=lambda x: convert_to_timestamp(x['date'], x['time']))
             
-            if success:
-                commit_messages.append(f"📅 Матчи: {len(self.bot.pending_matches)}")
-                success_count += len(self.bot.pending_matches)
-                self.bot.pending_matches = []  # Очищаем очередь
-            else:
-                # Откатываем изменения в случае ошибки
-                for _ in range(len(self.bot.pending_matches)):
-                    if regular_season["games"]:
-                        regular_season["games"].pop()
+            commit_messages.append(f"📅 Матчи: {len(pending_matches)}")
+            commit_parts.append(f"добавлено {len(pending_matches)} матчей")
         
         # Обрабатываем ожидающие результаты
-        if self.bot.pending_results:
-            next_game_number = self.bot.github_manager.get_next_game_number()
+        if pending_results:
+            # Резервируем номера для всех результатов сразу
+            next_game_number = await self.bot.github_manager.reserve_game_numbers(len(pending_results))
             
-            for i, result in enumerate(self.bot.pending_results):
+            for i, result in enumerate(pending_results):
                 game_number = next_game_number + i
-                commit_message = f"Добавлен результат игры {game_number:03d} | Добавил: {username}"
-                
-                success = self.bot.github_manager.save_game_result(
-                    result, 
-                    game_number, 
-                    commit_message
-                )
+                all_saved &= await self.bot.github_manager.save_game_result(result, game_number, "")
+                commit_messages.append(f"🏀 Результат игры {game_number:03d}")
+                if standings is not None:
+                    add_standings_game(standings, make_index_row(game_number, result))
                 
-                if success:
-                    commit_messages.append(f"🏀 Результат игры {game_number:03d}")
-                    success_count += 1
-                    
-                    # Удаляем матч из расписания после сохранения результата
-                    match_to_remove = result['match_info']
-                    for stage in self.bot.schedule_data.get("stages", []):
-                        stage["games"] = [game for game in stage.get("games", []) 
-                                        if not (game.get("teamHome") == match_to_remove["team_a"] and 
-                                               game.get("teamAway") == match_to_remove["team_b"] and 
-                                               game.get("date") == match_to_remove["date"] and 
-                                               game.get("time") == match_to_remove["time"])]
+                # Удаляем матч из расписания после сохранения результата
+                match_to_remove = result['match_info']
+                self.bot.get_schedule_model().remove_match({
+                    "teamHome": match_to_remove["team_a"],
+                    "teamAway": match_to_remove["team_b"],
+                    "date": match_to_remove["date"],
+                    "time": match_to_remove["time"]
+                })
             
-            # Сохраняем обновленное расписание (без сыгранных матчей)
-            if self.bot.pending_results:
-                commit_message = f"Удалено {len(self.bot.pending_results)} сыгранных матчей | Обновил: {username}"
-                self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
-                
-                self.bot.pending_results = []  # Очищаем очередь
-        
-        if success_count > 0:
-            storage_info = " локально" if not self.bot.github_manager.github_available else ""
+            if standings is not None:
+                all_saved &= await self.bot.github_manager.save_standings(standings, "")
             
-            result_text = "✅ Изменения применены и сохранены{}!\n\n📊 Сохранено:\n{}".format(
-                storage_info,
-                "\n".join([f"• {msg}" for msg in commit_messages])
-            )
-            
-            await query.edit_message_text(result_text)
-        else:
-            await query.edit_message_text(
-                "❌ Ошибка при сохранении! Изменения не применены.\n"
-                "Попробуйте позже."
-            )
+            last_game_number = next_game_number + len(pending_results) - 1
+            if last_game_number == next_game_number:
+                commit_parts.append(f"результат игры {next_game_number:03d}")
+            else:
+                commit_parts.append(f"результаты игр {next_game_number:03d}-{last_game_number:03d}")
         
-        await self.main_handlers.show_main_menu(query, context, is_query=True)
+        return commit_messages, commit_parts, all_saved
     
     async def delete_match_from_schedule(self, query, context, match_index):
         """Удалить матч (старый функционал)"""
@@ -360,20 +463,14 @@ class BotApplication:
             if 0 <= match_index < len(all_matches):
                 match_to_delete = all_matches[match_index]
                 
-                # Удаляем матч из структуры данных
-                for stage in self.bot.schedule_data.get("stages", []):
-                    stage["games"] = [game for game in stage.get("games", []) 
-                                    if not (game.get("teamHome") == match_to_delete["teamHome"] and 
-                                           game.get("teamAway") == match_to_delete["teamAway"] and 
-                                           game.get("date") == match_to_delete["date"] and 
-                                           game.get("time") == match_to_delete["time"])]
-                
-                # Сохраняем изменения
                 user = query.from_user
                 username = user.username if user.username else f"{user.first_name} {user.last_name}" if user.last_name else user.first_name
-                
                 commit_message = f"Удален матч: {match_to_delete['teamHome']} vs {match_to_delete['teamAway']} | Удалил: {username}"
-                success = self.bot.github_manager.save_schedule_to_github(self.bot.schedule_data, commit_message)
+                
+                async with self.bot.data_lock:
+                    # Удаляем матч из структуры данных и сохраняем изменения
+                    self.bot.get_schedule_model().remove_match(match_to_delete)
+                    success = await self.bot.github_manager.save_schedule_deferred(self.bot.schedule_data, commit_message)
                 
                 if success:
                     await query.edit_message_text(f"✅ Матч удален!")
@@ -400,13 +497,54 @@ class BotApplication:
             )
             await self.main_handlers.show_main_menu(update, context)
 
+    async def post_init(self, application: Application):
+        """Загрузка данных после инициализации приложения.
+
+        Бот начинает отвечать по локальной копии данных, а свежие данные
+        из хранилища загружаются в фоне и заменяют её.
+        """
+        await self.bot.load_cached_data()
+        self.startup_load = asyncio.create_task(self.bot.load_data_from_github())
+        await self.start_webhook_receiver()
+
+    async def start_webhook_receiver(self):
+        """Запустить приём webhook push из GitHub, если он настроен"""
+        if not GITHUB_WEBHOOK_PORT:
+            return
+        if not GITHUB_WEBHOOK_SECRET:
+            logger.error("Не задан GITHUB_WEBHOOK_SECRET, приём webhook GitHub не запущен")
+            return
+        try:
+            self.webhook_receiver = GitHubWebhookReceiver(
+                GITHUB_WEBHOOK_SECRET, self.bot.apply_remote_changes,
+                GITHUB_WEBHOOK_HOST, GITHUB_WEBHOOK_PORT, GITHUB_WEBHOOK_PATH, GITHUB_BRANCH
+            )
+            await self.webhook_receiver.start()
+            self.bot.push_notifications = True
+        except Exception as e:
+            logger.error(f"Не удалось запустить приём webhook GitHub: {e}")
+            self.webhook_receiver = None
+
+    async def post_shutdown(self, application: Application):
+        """Закрытие HTTP-сессии GitHub и пула обработки изображений при остановке"""
+        if self.startup_load is not None and not self.startup_load.done():
+            self.startup_load.cancel()
+        if self.webhook_receiver is not None:
+            await self.webhook_receiver.close()
+        await self.github_manager.close()
+        self.stats_handlers.image_processor.close()
+
     def run(self):
         """Запуск бота"""
-        # Загружаем данные при старте
-        self.bot.load_data_from_github()
-        
-        # Создание приложения
-        self.application = Application.builder().token(TELEGRAM_TOKEN).build()
+        # Создание приложения (данные загружаются в post_init, апдейты обрабатываются параллельно)
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_TOKEN)
+            .concurrent_updates(True)
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
+            .build()
+        )
         
         # Настройка обработчиков
         self.setup_handlers()
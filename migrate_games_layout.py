@@ -0,0 +1,31 @@
+import argparse
+import asyncio
+import logging
+from config import *
+from github_manager import GitHubManager
+
+# Перенос архива игр из плоской раскладки (data/games/game_123.json) в блоки
+# по GAMES_SHARD_SIZE номеров (data/games/00100/game_123.json). Для GitHub все
+# файлы переносятся одним коммитом без повторной загрузки содержимого.
+#
+#   python migrate_games_layout.py --dry-run   # показать, что будет перенесено
+#   python migrate_games_layout.py
+
+logging.basicConfig(format=LOG_FORMAT, level=getattr(logging, LOG_LEVEL))
+
+
+async def migrate(dry_run):
+    github_manager = GitHubManager(GITHUB_TOKEN, GITHUB_REPO_OWNER, GITHUB_REPO_NAME)
+    try:
+        moves = await github_manager.migrate_games_layout("Перенос архива игр в блоки по номерам", dry_run)
+        for old_path, new_path in sorted(moves.items()):
+            print(f"{old_path} -> {new_path}")
+    finally:
+        await github_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенести архив игр в блочную раскладку")
+    parser.add_argument("--dry-run", action="store_true", help="только показать переносимые файлы")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run))
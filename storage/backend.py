@@ -0,0 +1,133 @@
+import logging
+from config import GAMES_FETCH_CONCURRENCY, GAMES_FETCH_TIMEOUT
+from storage.games_index import build_index, extract_game_number, image_hashes_from_index, row_matches
+from storage.parallel_fetch import fetch_all
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """Интерфейс хранилища данных чемпионата.
+
+    Документы (конфигурация лиг, команды, залы, расписание) адресуются путями
+    из config.py, игры - номерами. Реализации сами обрабатывают свои ошибки и
+    возвращают значения по умолчанию, как это делал GitHubManager.
+    """
+
+    name = None
+
+    # Растёт, когда хранилище меняет загруженный документ на месте (слияние
+    # с версией из репозитория): построенные по нему модели надо перестроить
+    data_version = 0
+
+    async def close(self):
+        """Освободить ресурсы хранилища"""
+
+    def status(self):
+        """Состояние хранилища для операторов (лимиты, очереди)"""
+        return {}
+
+    def begin_batch(self):
+        """Начать пакетный режим (по умолчанию записи выполняются сразу)"""
+
+    def discard_batch(self):
+        """Отменить пакетный режим без записи"""
+
+    async def commit_batch(self, commit_message):
+        """Записать накопленные изменения"""
+        return True
+
+    async def get_change_marks(self):
+        """{путь: версия} для элементов директории данных или None, если изменения не отслеживаются.
+
+        Версия меняется при любом изменении файла или содержимого директории,
+        поэтому по разнице двух снимков видно, какие пути изменились.
+        """
+        return None
+
+    async def load_json(self, file_path, default):
+        """Загрузить JSON-документ или вернуть default"""
+        raise NotImplementedError
+
+    async def save_json(self, file_path, data, commit_message):
+        """Сохранить JSON-документ, вернуть True при успехе"""
+        raise NotImplementedError
+
+    async def load_cached_json(self, file_path, default):
+        """Последняя локально сохранённая версия документа, без обращения к сети"""
+        return await self.load_json(file_path, default)
+
+    async def get_all_games(self):
+        """Все игры: список {'file_name', 'data', 'path'}"""
+        raise NotImplementedError
+
+    async def load_game(self, filename):
+        """Данные игры по имени файла или None"""
+        raise NotImplementedError
+
+    async def load_games(self, filenames):
+        """Данные нескольких игр {имя файла: данные} в порядке номеров игр.
+
+        Файлы загружаются параллельно (GAMES_FETCH_CONCURRENCY) с таймаутом на
+        каждый. Незагруженные игры в результат не попадают и перечисляются в журнале.
+        """
+        filenames = sorted(set(filenames), key=lambda filename: extract_game_number(filename) or 0)
+        results, errors = await fetch_all(filenames, self._fetch_game, GAMES_FETCH_CONCURRENCY, GAMES_FETCH_TIMEOUT)
+        if errors:
+            details = ", ".join(f"{filename} ({error})" for filename, error in errors.items())
+            logger.warning(f"Не загружено игр: {len(errors)} из {len(filenames)}: {details}")
+        return {filename: results[filename] for filename in filenames if filename in results}
+
+    async def _fetch_game(self, filename):
+        """Данные игры для load_games; исключение означает, что игра не загружена"""
+        game_data = await self.load_game(filename)
+        if game_data is None:
+            raise FileNotFoundError(filename)
+        return game_data
+
+    async def save_game_result(self, game_data, game_number, commit_message):
+        """Сохранить результат игры вместе со строкой индекса"""
+        raise NotImplementedError
+
+    async def get_games_with_statistics(self):
+        """Номера игр, для которых сохранено изображение статистики"""
+        raise NotImplementedError
+
+    async def save_statistics_image(self, image_data, game_number, commit_message, thumbnail=None, image_phash=None):
+        """Сохранить изображение статистики (и миниатюру) и отметить игру в индексе с хэшами"""
+        raise NotImplementedError
+
+    async def get_statistics_image_hashes(self):
+        """[(номер игры, sha изображения, перцептивный хэш или None)] сохранённых изображений"""
+        return image_hashes_from_index(await self.get_games_index())
+
+    async def get_games_index(self):
+        """Индекс игр или None, если он ещё не создан"""
+        raise NotImplementedError
+
+    async def save_games_index(self, index, commit_message):
+        """Сохранить индекс игр"""
+        raise NotImplementedError
+
+    async def build_games_index(self):
+        """Собрать индекс по исходным данным игр"""
+        games = await self.get_all_games()
+        games_with_stats = await self.get_games_with_statistics()
+        numbered_games = [
+            (extract_game_number(game['file_name']), game.get('data', {}))
+            for game in games
+        ]
+        return build_index([(n, data) for n, data in numbered_games if n], games_with_stats)
+
+    async def migrate_games_layout(self, commit_message, dry_run=False):
+        """Перенести файлы плоской раскладки архива в блоки, вернуть {старый путь: новый}"""
+        return {}
+
+    async def find_games(self, league=None, team=None, date=None, without_stats=False, limit=None):
+        """Строки индекса по фильтрам, от новых игр к старым"""
+        index = await self.get_games_index() or await self.build_games_index()
+        rows = [
+            row for row in reversed(index["games"])
+            if row_matches(row, league, team, date, without_stats)
+        ]
+        return rows[:limit] if limit else rows
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+from config import DATA_DIR_PATH, GAMES_DIR_PATH, GAMES_INDEX_PATH, LOCAL_ARCHIVE_WATCH, RESULT_IMAGES_DIR
+from storage.backend import StorageBackend
+from storage.games_index import (STATS_IMAGE_SUFFIXES, empty_index, image_hashes_from_index, make_index_row,
+                                 mark_has_stats, upsert_row)
+from storage.games_layout import (ARCHIVE_DIRS, game_file_path, game_file_paths, sharded_path, stats_image_path,
+                                  stats_thumbnail_path)
+from storage.github_client import git_blob_sha
+from storage.local_archive import LocalArchiveCache, scan_archive
+
+logger = logging.getLogger(__name__)
+
+
+def _read_json(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _file_blob_sha(file_path):
+    with open(file_path, 'rb') as f:
+        return git_blob_sha(f.read())
+
+
+class FileSystemStorage(StorageBackend):
+    """Хранение данных в локальных JSON-файлах (те же пути, что и в репозитории)"""
+
+    name = "filesystem"
+
+    def __init__(self):
+        # Файлы игр и sha изображений перечитываются, только если файл изменился
+        self._games_cache = LocalArchiveCache(GAMES_DIR_PATH, (".json",), _read_json, LOCAL_ARCHIVE_WATCH)
+        self._images_cache = LocalArchiveCache(RESULT_IMAGES_DIR, STATS_IMAGE_SUFFIXES, _file_blob_sha,
+                                               LOCAL_ARCHIVE_WATCH)
+        self._games_list = (None, [])  # (версия кэша файлов, список игр)
+
+    async def load_json(self, file_path, default):
+        return self._load_local_data(file_path, default)
+
+    async def save_json(self, file_path, data, commit_message):
+        return self._save_local_data(file_path, data)
+
+    async def get_change_marks(self):
+        marks = {}
+        if not os.path.isdir(DATA_DIR_PATH):
+            return marks
+        # Архивы игр и изображений отмечаются версиями их кэшей: с inotify обход
+        # архива не нужен, без него кэш сверяет stat() файлов и перечитывает только изменившиеся
+        archives = {GAMES_DIR_PATH: self._games_cache, RESULT_IMAGES_DIR: self._images_cache}
+        for entry in os.scandir(DATA_DIR_PATH):
+            path = f"{DATA_DIR_PATH}/{entry.name}"
+            archive = archives.get(path)
+            if archive is not None and entry.is_dir():
+                archive.files()
+                marks[path] = (archive.version,)
+            else:
+                stat = entry.stat()
+                marks[path] = (stat.st_mtime_ns, stat.st_size)
+        if GAMES_DIR_PATH in marks and os.path.exists(GAMES_INDEX_PATH):
+            # Индекс игр лежит в директории игр, но в кэш файлов игр не входит
+            stat = os.stat(GAMES_INDEX_PATH)
+            marks[GAMES_DIR_PATH] += (stat.st_mtime_ns, stat.st_size)
+        return marks
+
+    async def get_all_games(self):
+        return self._get_local_games()
+
+    async def load_game(self, filename):
+        try:
+            # Блочная раскладка, затем плоская (файлы, ещё не перенесённые в блоки)
+            for file_path in game_file_paths(filename):
+                if os.path.exists(file_path):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        return json.load(f)
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке данных игры {filename}: {e}")
+            return None
+
+    async def save_game_result(self, game_data, game_number, commit_message):
+        file_path = game_file_path(game_number)
+        index = self._load_local_data(GAMES_INDEX_PATH, None) or empty_index()
+        upsert_row(index, make_index_row(game_number, game_data))
+        return (self._save_local_data(file_path, game_data) and
+                self._save_local_data(GAMES_INDEX_PATH, index))
+
+    async def get_games_with_statistics(self):
+        return self._get_local_games_with_stats()
+
+    async def save_statistics_image(self, image_data, game_number, commit_message, thumbnail=None, image_phash=None):
+        index = self._load_local_data(GAMES_INDEX_PATH, None)
+        if index and mark_has_stats(index, game_number, git_blob_sha(image_data), image_phash):
+            self._save_local_data(GAMES_INDEX_PATH, index)
+        if thumbnail is not None:
+            self.save_file(stats_thumbnail_path(game_number), thumbnail)
+        return self.save_file(stats_image_path(game_number), image_data)
+
+    async def get_statistics_image_hashes(self):
+        hashes = image_hashes_from_index(self._load_local_data(GAMES_INDEX_PATH, None))
+        # Изображения, сохранённые до появления хэшей в индексе, хэшируются по файлам
+        known = {game_number for game_number, _, _ in hashes}
+        for game_number, entry in self._images_cache.files().items():
+            if game_number not in known and entry['error'] is None:
+                hashes.append((game_number, entry['value'], None))
+        return hashes
+
+    async def migrate_games_layout(self, commit_message, dry_run=False):
+        moves = {}
+        for archive_dir in ARCHIVE_DIRS:
+            if not os.path.isdir(archive_dir):
+                continue
+            for filename in os.listdir(archive_dir):
+                new_path = sharded_path(archive_dir, filename)
+                if new_path and os.path.isfile(os.path.join(archive_dir, filename)):
+                    moves[f"{archive_dir}/{filename}"] = new_path
+
+        if not dry_run:
+            for old_path, new_path in moves.items():
+                os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                os.replace(old_path, new_path)
+        return moves
+
+    async def get_games_index(self):
+        return self._load_local_data(GAMES_INDEX_PATH, None)
+
+    async def save_games_index(self, index, commit_message):
+        return self._save_local_data(GAMES_INDEX_PATH, index)
+
+    def _load_local_data(self, filename, default):
+        """Загрузить данные из локального файла"""
+        try:
+            if os.path.exists(filename):
+                with open(filename, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return default
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке локального файла {filename}: {e}")
+            return default
+
+    def _save_local_data(self, filename, data):
+        """Сохранить данные в локальный файл"""
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении локального файла {filename}: {e}")
+            return False
+
+    def save_file(self, file_path, content):
+        """Сохранить файл локально по пути из репозитория"""
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении локального файла {file_path}: {e}")
+            return False
+
+    def _get_local_games(self):
+        """Получить все игры локально (разбираются только изменившиеся файлы)"""
+        try:
+            files = self._games_cache.files()
+            version, games = self._games_list
+            if version == self._games_cache.version:
+                return list(games)
+
+            games = []
+            for game_number, entry in sorted(files.items()):
+                filename = os.path.basename(entry['path'])
+                if entry['error'] is None:
+                    games.append({
+                        'file_name': filename,
+                        'data': entry['value'],
+                        'path': entry['path']
+                    })
+                else:
+                    logger.error(f"Ошибка при загрузке локальной игры {filename}: {entry['error']}")
+                    # Добавляем игру даже без данных
+                    games.append({
+                        'file_name': filename,
+                        'path': entry['path']
+                    })
+
+            self._games_list = (self._games_cache.version, games)
+            return list(games)
+        except Exception as e:
+            logger.error(f"Ошибка при получении локальных игр: {e}")
+            return []
+
+    def _get_local_games_with_stats(self):
+        """Получить игры со статистикой локально"""
+        try:
+            return set(scan_archive(RESULT_IMAGES_DIR, STATS_IMAGE_SUFFIXES))
+        except Exception as e:
+            logger.error(f"Ошибка при получении локальных игр со статистикой: {e}")
+            return set()
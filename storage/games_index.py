@@ -0,0 +1,130 @@
+# Компактный индекс игр (data/games/index.json): одна строка на файл game_NNN.json
+# с номером, лигой, командами, счётом, датой и признаком наличия статистики.
+# Индекс обновляется тем же коммитом, что и сам результат, поэтому списки игр
+# строятся без разбора всех файлов архива.
+
+from config import STATS_IMAGE_FORMAT
+
+GAMES_INDEX_VERSION = 1
+
+# Расширения изображений статистики (game_NNN.<расширение>)
+STATS_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+STATS_IMAGE_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+
+
+def empty_index():
+    return {"version": GAMES_INDEX_VERSION, "next_number": 1, "games": []}
+
+
+def game_file_name(game_number):
+    """Имя файла игры (game_001.json)"""
+    return f"game_{game_number:03d}.json"
+
+
+def make_index_row(game_number, game_data, has_stats=False):
+    """Строка индекса по данным игры"""
+    match_info = game_data.get('match_info', {}) if isinstance(game_data, dict) else {}
+    return {
+        "number": game_number,
+        "file": game_file_name(game_number),
+        "league": match_info.get('league') or match_info.get('competition', ''),
+        "team_a": match_info.get('team_a', ''),
+        "team_b": match_info.get('team_b', ''),
+        "score": match_info.get('score', ''),
+        "date": match_info.get('date', ''),
+        "time": match_info.get('time', ''),
+        "venue": match_info.get('venue', ''),
+        "game_type": match_info.get('gameType') or 'regular',
+        "has_stats": has_stats,
+    }
+
+
+def build_index(numbered_games, games_with_stats):
+    """Собрать индекс из пар (номер игры, данные игры)"""
+    index = empty_index()
+    for game_number, game_data in numbered_games:
+        index["games"].append(make_index_row(game_number, game_data, game_number in games_with_stats))
+    index["games"].sort(key=lambda row: row["number"])
+    index["next_number"] = max((row["number"] for row in index["games"]), default=0) + 1
+    return index
+
+
+def upsert_row(index, row):
+    """Добавить или заменить строку игры, сохраняя порядок по номеру"""
+    rows = [existing for existing in index["games"] if existing["number"] != row["number"]]
+    rows.append(row)
+    rows.sort(key=lambda r: r["number"])
+    index["games"] = rows
+    # Верхняя граница номеров только растёт - номера не переиспользуются
+    index["next_number"] = max(index.get("next_number", 1), row["number"] + 1)
+    return index
+
+
+def mark_has_stats(index, game_number, image_sha=None, image_phash=None):
+    """Отметить, что у игры есть изображение статистики (с хэшами изображения)"""
+    for row in index["games"]:
+        if row["number"] == game_number:
+            row["has_stats"] = True
+            if image_sha:
+                row["image_sha"] = image_sha
+                row["image_phash"] = image_phash
+            return True
+    return False
+
+
+def image_hashes_from_index(index):
+    """[(номер игры, sha изображения, перцептивный хэш)] по строкам индекса"""
+    return [
+        (row["number"], row["image_sha"], row.get("image_phash"))
+        for row in (index or {}).get("games", [])
+        if row.get("image_sha")
+    ]
+
+
+def extract_game_number(filename):
+    """Номер игры из имени файла (game_001.json, game_001.jpg, ...) или None"""
+    try:
+        if filename.startswith("game_") and filename.endswith((".json",) + STATS_IMAGE_SUFFIXES):
+            return int(filename.split("_")[1].split(".")[0])
+        return None
+    except ValueError:
+        return None
+
+
+def stats_image_name(game_number):
+    """Имя файла изображения статистики в текущем формате"""
+    return f"game_{game_number:03d}.{STATS_IMAGE_EXTENSIONS.get(STATS_IMAGE_FORMAT, 'jpg')}"
+
+
+def row_matches(row, league=None, team=None, date=None, without_stats=False):
+    """Проверить строку индекса по фильтрам find_games"""
+    if league and row["league"] != league:
+        return False
+    if team and team not in (row["team_a"], row["team_b"]):
+        return False
+    if date and row["date"] != date:
+        return False
+    if without_stats and row["has_stats"]:
+        return False
+    return True
+
+
+def row_to_game_info(row, file_path):
+    """Строка индекса в формате элементов get_all_games (для отображения)"""
+    return {
+        'file_name': row["file"],
+        'game_number': row["number"],
+        'path': file_path,
+        'data': {
+            'match_info': {
+                'team_a': row["team_a"],
+                'team_b': row["team_b"],
+                'score': row["score"],
+                'date': row["date"],
+                'time': row["time"],
+                'venue': row["venue"],
+                'league': row["league"],
+                'gameType': row["game_type"],
+            }
+        },
+    }
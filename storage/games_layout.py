@@ -0,0 +1,66 @@
+# Раскладка архива игр по блокам номеров. Contents API отдаёт не больше 1000
+# элементов директории, поэтому файлы игр и изображений статистики хранятся в
+# поддиректориях по GAMES_SHARD_SIZE номеров: data/games/00100/game_123.json,
+# data/result/00100/game_123.jpg, data/result/thumbnails/00100/game_123.jpg.
+# Файлы прежней плоской раскладки (data/games/game_123.json) читаются, пока их
+# не перенесёт migrate_games_layout.py. Имя файла (game_123.json) по-прежнему
+# идентифицирует игру в индексе и в интерфейсе хранилищ.
+
+from config import GAMES_DIR_PATH, GAMES_SHARD_SIZE, RESULT_IMAGES_DIR, RESULT_THUMBNAILS_DIR
+from storage.games_index import extract_game_number, game_file_name, stats_image_name
+
+# Директории архива, файлы которых раскладываются по блокам
+ARCHIVE_DIRS = (GAMES_DIR_PATH, RESULT_IMAGES_DIR, RESULT_THUMBNAILS_DIR)
+
+
+def game_shard(game_number):
+    """Имя директории блока для номера игры (00000, 00100, ...)"""
+    return f"{game_number // GAMES_SHARD_SIZE * GAMES_SHARD_SIZE:05d}"
+
+
+def game_file_path(game_number):
+    """Путь файла игры в блочной раскладке"""
+    return f"{GAMES_DIR_PATH}/{game_shard(game_number)}/{game_file_name(game_number)}"
+
+
+def game_file_paths(filename):
+    """Пути, по которым может лежать файл игры: сначала блочный, затем плоский"""
+    game_number = extract_game_number(filename)
+    flat_path = f"{GAMES_DIR_PATH}/{filename}"
+    if game_number is None:
+        return [flat_path]
+    return [f"{GAMES_DIR_PATH}/{game_shard(game_number)}/{filename}", flat_path]
+
+
+def stats_image_path(game_number):
+    return f"{RESULT_IMAGES_DIR}/{game_shard(game_number)}/{stats_image_name(game_number)}"
+
+
+def stats_thumbnail_path(game_number):
+    return f"{RESULT_THUMBNAILS_DIR}/{game_shard(game_number)}/{stats_image_name(game_number)}"
+
+
+def archive_file_name(relative_path):
+    """Имя файла по пути внутри директории архива, если это файл игры или изображения.
+
+    Подходят файлы в корне директории (плоская раскладка) и в директориях блоков;
+    вложенные директории (например, thumbnails внутри data/result) пропускаются.
+    """
+    parts = relative_path.split("/")
+    if len(parts) == 2 and parts[0].isdigit():
+        name = parts[1]
+    elif len(parts) == 1:
+        name = parts[0]
+    else:
+        return None
+    return name if extract_game_number(name) is not None else None
+
+
+def sharded_path(archive_dir, relative_path):
+    """Новый путь для файла плоской раскладки (None, если файл уже в блоке или не из архива)"""
+    if "/" in relative_path:
+        return None
+    game_number = extract_game_number(relative_path)
+    if game_number is None:
+        return None
+    return f"{archive_dir}/{game_shard(game_number)}/{relative_path}"
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import os
+from storage.games_index import extract_game_number
+from storage.games_layout import archive_file_name
+
+logger = logging.getLogger(__name__)
+
+
+class GamesSnapshot:
+    """Локальный снимок директории с играми, синхронизируемый по git-дереву.
+
+    Для каждого файла хранится sha blob'а, путь внутри директории и разобранные
+    данные. При синхронизации загружается только дерево директории (рекурсивно,
+    вместе с блоками архива) и те blob'ы, чей sha изменился, поэтому полная
+    синхронизация архива стоит O(изменённых файлов) запросов.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.tree_sha = None
+        self._files = {}  # имя файла -> {'sha': str, 'path': str, 'data': dict}
+        self._load()
+
+    def _load(self):
+        if not self.file_path or not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.tree_sha = snapshot.get('tree_sha')
+            self._files = snapshot.get('files', {})
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке снимка игр {self.file_path}: {e}")
+
+    def _save(self):
+        if not self.file_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'tree_sha': self.tree_sha, 'files': self._files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении снимка игр {self.file_path}: {e}")
+
+    def get(self, filename):
+        """Данные игры из снимка или None"""
+        entry = self._files.get(filename)
+        return entry['data'] if entry else None
+
+    def games(self, dir_path):
+        """Все игры снимка в формате get_all_games, по номеру игры"""
+        return [
+            {'file_name': name, 'data': entry['data'], 'path': f"{dir_path}/{entry.get('path', name)}"}
+            for name, entry in sorted(self._files.items(), key=lambda item: extract_game_number(item[0]) or 0)
+        ]
+
+    async def sync(self, client, dir_path, concurrency):
+        """Привести снимок в соответствие с директорией в репозитории"""
+        tree_sha = await client.get_directory_sha(dir_path)
+        if tree_sha is None:
+            self.tree_sha, self._files = None, {}
+            return self.games(dir_path)
+        if tree_sha == self.tree_sha:
+            return self.games(dir_path)
+
+        paths = {}
+        entries = {}
+        for item in await client.get_tree(tree_sha, recursive=True):
+            name = archive_file_name(item['path'])
+            if item['type'] != 'blob' or not name or not name.endswith(".json"):
+                continue
+            # Если файл есть в обеих раскладках (перенос не завершён), берётся блочный
+            if name not in paths or "/" in item['path']:
+                paths[name] = item['path']
+                entries[name] = item['sha']
+        changed = [name for name, sha in entries.items() if self._files.get(name, {}).get('sha') != sha]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(name):
+            async with semaphore:
+                content = await client.get_blob(entries[name])
+            return name, json.loads(content.decode('utf-8'))
+
+        results = await asyncio.gather(*(fetch(name) for name in changed), return_exceptions=True)
+
+        # У перенесённых файлов sha не меняется, меняется только путь
+        files = {name: dict(entry, path=paths[name]) for name, entry in self._files.items() if name in entries}
+        complete = True
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Ошибка при загрузке файла игры: {result}")
+                complete = False
+                continue
+            name, data = result
+            files[name] = {'sha': entries[name], 'path': paths[name], 'data': data}
+
+        self._files = files
+        # Если часть blob'ов не загрузилась, дерево не запоминаем - они догрузятся в следующий раз
+        self.tree_sha = tree_sha if complete else None
+        self._save()
+
+        logger.info(f"Снимок игр обновлён: {len(changed)} из {len(entries)} файлов загружено")
+        return self.games(dir_path)
@@ -0,0 +1,371 @@
+import base64
+import hashlib
+import logging
+import httpx
+from config import GITHUB_API_URL, GITHUB_CONNECT_TIMEOUT, GITHUB_READ_TIMEOUT, GITHUB_MAX_CONNECTIONS
+from storage.request_scheduler import BACKGROUND, INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubAPIError(Exception):
+    """Ошибка ответа GitHub API"""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class GitHubConflictError(Exception):
+    """Файл в репозитории изменился с момента чтения"""
+
+    def __init__(self, path):
+        super().__init__(f"Файл {path} был изменён другим коммитом")
+        self.path = path
+
+
+# Размер части при потоковом base64-кодировании (кратен 3 - части склеиваются без выравнивания)
+BLOB_CHUNK_SIZE = 3 * 16 * 1024
+
+
+def git_blob_sha(content):
+    """SHA git-blob'а для содержимого файла (как его посчитает сам git)"""
+    digest = hashlib.sha1(b"blob %d\0" % len(content))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def base64_json_body(content):
+    """Тело {"encoding": "base64", "content": ...} частями, без base64-копии всего файла.
+
+    Возвращает фабрику асинхронного потока (поток нужен заново при повторе запроса)
+    и точную длину тела для Content-Length.
+    """
+    prefix = b'{"encoding": "base64", "content": "'
+    suffix = b'"}'
+    view = memoryview(content)
+
+    async def body():
+        yield prefix
+        for start in range(0, len(view), BLOB_CHUNK_SIZE):
+            yield base64.b64encode(view[start:start + BLOB_CHUNK_SIZE])
+        yield suffix
+
+    return body, len(prefix) + 4 * ((len(view) + 2) // 3) + len(suffix)
+
+
+class GitHubClient:
+    """Асинхронный клиент GitHub REST API с общим пулом соединений"""
+
+    def __init__(self, token, owner, repo_name, scheduler, branch=None, cache=None):
+        self.token = token
+        self.owner = owner
+        self.repo_name = repo_name
+        self.scheduler = scheduler
+        self.branch = branch
+        self.cache = cache
+        self._client = None
+        # SHA blob'ов, последних прочитанных или записанных клиентом: путь -> sha
+        self._file_shas = {}
+
+    @property
+    def repo_url(self):
+        return f"/repos/{self.owner}/{self.repo_name}"
+
+    def _get_client(self):
+        """Создать HTTP-сессию при первом обращении (keep-alive, таймауты)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=GITHUB_API_URL,
+                headers={
+                    "Authorization": f"token {self.token}",
+                    "Accept": "application/vnd.github.v3+json",
+                },
+                timeout=httpx.Timeout(GITHUB_READ_TIMEOUT, connect=GITHUB_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=GITHUB_MAX_CONNECTIONS,
+                    max_keepalive_connections=GITHUB_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def request(self, method, url, priority=None, **kwargs):
+        """Выполнить запрос к API через планировщик и вернуть ответ.
+
+        По умолчанию чтение (GET) считается интерактивным, запись - фоновой.
+        Фоновый запрос, упёршийся в лимит, повторяется один раз после паузы.
+        """
+        if priority is None:
+            priority = INTERACTIVE if method == "GET" else BACKGROUND
+        client = self._get_client()
+
+        def send():
+            # Потоковое тело передаётся фабрикой и создаётся заново для каждой попытки
+            content = kwargs.get('content')
+            if callable(content):
+                return client.request(method, url, **dict(kwargs, content=content()))
+            return client.request(method, url, **kwargs)
+
+        response = await self.scheduler.run(priority, send)
+        if (priority == BACKGROUND and response.status_code in (403, 429) and
+                self.scheduler.is_rate_limited(response)):
+            response = await self.scheduler.run(priority, send)
+        return response
+
+    async def close(self):
+        """Закрыть HTTP-сессию и сохранить кэш ответов"""
+        if self.cache:
+            self.cache.save()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _raise_for_status(self, response):
+        if response.status_code >= 400:
+            raise GitHubAPIError(response.status_code, response.text)
+
+    def _ref_params(self, ref=None):
+        ref = ref or self.branch
+        return {"ref": ref} if ref else {}
+
+    async def _get_json(self, url, params=None, cacheable=True):
+        """GET-запрос с условными заголовками; возвращает тело ответа или None при 404.
+
+        Если ресурс не изменился (304), тело берётся из кэша ответов. Ресурсы,
+        адресуемые SHA (git-деревья, файлы на заданном коммите), не меняются и
+        повторно не запрашиваются - их не кэшируют (cacheable=False), чтобы
+        кэш не разрастался ответами, к которым больше не обратятся.
+        """
+        cache = self.cache if cacheable else None
+        key = str(httpx.URL(url, params=params))
+        headers = cache.conditional_headers(key) if cache else {}
+        # Тело к этим заголовкам: запись могут вытеснить параллельные запросы
+        cached_body = cache.peek(key) if cache else None
+
+        response = await self.request("GET", url, params=params, headers=headers)
+        if response.status_code == 304 and cache:
+            return cache.get(key, cached_body)
+        if response.status_code == 404:
+            if cache:
+                cache.discard(key)
+            return None
+        self._raise_for_status(response)
+
+        body = response.json()
+        if cache:
+            cache.store(key, response, body)
+        return body
+
+    async def get_file(self, path, ref=None):
+        """Получить файл из репозитория: {'content': bytes, 'sha': str} или None, если файла нет"""
+        file_info = await self._get_json(f"{self.repo_url}/contents/{path}", self._ref_params(ref),
+                                         cacheable=ref is None)
+        if file_info is None:
+            if ref is None:
+                self._file_shas[path] = None
+            return None
+        if ref is None:
+            self._file_shas[path] = file_info['sha']
+
+        return {
+            'content': base64.b64decode(file_info.get('content', '')),
+            'sha': file_info['sha'],
+            'path': file_info['path'],
+        }
+
+    def get_cached_file(self, path):
+        """Последняя полученная версия файла из кэша ответов, без обращения к сети (или None)"""
+        if not self.cache:
+            return None
+        file_info = self.cache.peek(str(httpx.URL(f"{self.repo_url}/contents/{path}", params=self._ref_params())))
+        if not isinstance(file_info, dict) or 'content' not in file_info:
+            return None
+        return {
+            'content': base64.b64decode(file_info['content']),
+            'sha': file_info['sha'],
+            'path': file_info['path'],
+        }
+
+    async def list_directory(self, path):
+        """Получить список элементов директории (пустой список, если её нет)"""
+        contents = await self._get_json(f"{self.repo_url}/contents/{path}", self._ref_params())
+        if contents is None:
+            return []
+        return contents if isinstance(contents, list) else [contents]
+
+    async def get_directory_sha(self, path):
+        """SHA git-дерева директории (по листингу родительской директории) или None"""
+        parent, _, name = path.rpartition('/')
+        for item in await self.list_directory(parent):
+            if item['name'] == name and item['type'] == 'dir':
+                return item['sha']
+        return None
+
+    async def get_tree(self, tree_sha, recursive=False):
+        """Элементы git-дерева: список {'path', 'type', 'sha', ...} (recursive - со всеми поддеревьями)"""
+        params = {"recursive": "1"} if recursive else None
+        tree = await self._get_json(f"{self.repo_url}/git/trees/{tree_sha}", params, cacheable=False)
+        if tree is None:
+            return []
+        if tree.get('truncated'):
+            logger.warning(f"Дерево {tree_sha} получено не полностью")
+        return tree['tree']
+
+    async def get_blob(self, blob_sha):
+        """Содержимое blob'а в сыром виде (без base64)"""
+        response = await self.request(
+            "GET", f"{self.repo_url}/git/blobs/{blob_sha}",
+            headers={"Accept": "application/vnd.github.raw"}
+        )
+        self._raise_for_status(response)
+        return response.content
+
+    async def put_file(self, path, content, commit_message, sha=None):
+        """Создать или обновить файл, вернуть новый sha"""
+        data = {
+            "message": commit_message,
+            "content": base64.b64encode(content).decode('ascii'),
+        }
+        if sha:
+            data["sha"] = sha
+        if self.branch:
+            data["branch"] = self.branch
+
+        response = await self.request("PUT", f"{self.repo_url}/contents/{path}", json=data)
+        self._raise_for_status(response)
+        new_sha = response.json()["content"]["sha"]
+        self._file_shas[path] = new_sha
+        return new_sha
+
+    async def save_file(self, path, content, commit_message):
+        """Создать или обновить файл, используя известный sha без предварительного чтения.
+
+        Если sha устарел (файл изменили в обход клиента), GitHub отвечает 409/422 -
+        тогда актуальный sha перечитывается и запись повторяется один раз.
+        """
+        if path in self._file_shas:
+            sha = self._file_shas[path]
+        else:
+            file_info = await self.get_file(path)
+            sha = file_info['sha'] if file_info else None
+        try:
+            return await self.put_file(path, content, commit_message, sha)
+        except GitHubAPIError as e:
+            if e.status_code not in (409, 422):
+                raise
+            logger.warning(f"SHA файла {path} устарел, повторная запись")
+            self._file_shas.pop(path, None)
+            file_info = await self.get_file(path)
+            return await self.put_file(path, content, commit_message, file_info['sha'] if file_info else None)
+
+    async def get_branch(self):
+        """Имя рабочей ветки (по умолчанию - основная ветка репозитория)"""
+        if not self.branch:
+            response = await self.request("GET", self.repo_url)
+            self._raise_for_status(response)
+            self.branch = response.json()["default_branch"]
+        return self.branch
+
+    async def get_branch_head(self):
+        """SHA последнего коммита рабочей ветки"""
+        branch = await self.get_branch()
+        response = await self.request("GET", f"{self.repo_url}/git/ref/heads/{branch}")
+        self._raise_for_status(response)
+        return response.json()["object"]["sha"]
+
+    async def get_commit_tree(self, commit_sha):
+        """SHA дерева указанного коммита"""
+        response = await self.request("GET", f"{self.repo_url}/git/commits/{commit_sha}")
+        self._raise_for_status(response)
+        return response.json()["tree"]["sha"]
+
+    async def create_blob(self, content):
+        """Загрузить бинарные данные как blob, вернуть его sha.
+
+        Тело запроса кодируется и отправляется по частям, поэтому размер файла
+        не ограничен лимитом contents API, а в памяти не появляется его base64-копия.
+        """
+        body, length = base64_json_body(content)
+        response = await self.request("POST", f"{self.repo_url}/git/blobs", content=body, headers={
+            "Content-Type": "application/json",
+            "Content-Length": str(length),
+        })
+        self._raise_for_status(response)
+        return response.json()["sha"]
+
+    async def commit_files(self, files, commit_message, expected_shas=None, max_attempts=3):
+        """Записать несколько файлов одним коммитом через Git Data API.
+
+        files - словарь {путь: bytes}. Текстовые файлы передаются прямо в дереве,
+        бинарные загружаются отдельными blob'ами. Если ветка ушла вперёд, коммит
+        пересобирается поверх новой головы. expected_shas - {путь: sha или None}:
+        если в голове ветки файл отличается от ожидаемого, поднимается
+        GitHubConflictError. Возвращает sha созданного коммита.
+        """
+        tree_entries = []
+        for path, content in files.items():
+            entry = {"path": path, "mode": "100644", "type": "blob"}
+            try:
+                entry["content"] = content.decode('utf-8')
+            except UnicodeDecodeError:
+                entry["sha"] = await self.create_blob(content)
+            tree_entries.append(entry)
+
+        commit_sha = await self._commit_tree_entries(tree_entries, commit_message, expected_shas, max_attempts)
+        for path, content in files.items():
+            self._file_shas[path] = git_blob_sha(content)
+        return commit_sha
+
+    async def move_files(self, moves, commit_message, max_attempts=3):
+        """Перенести файлы одним коммитом без повторной загрузки содержимого.
+
+        moves - словарь {старый путь: (новый путь, sha blob'а)}. Новые записи
+        дерева ссылаются на существующие blob'ы, старые удаляются.
+        """
+        tree_entries = []
+        for old_path, (new_path, blob_sha) in moves.items():
+            tree_entries.append({"path": new_path, "mode": "100644", "type": "blob", "sha": blob_sha})
+            tree_entries.append({"path": old_path, "mode": "100644", "type": "blob", "sha": None})
+
+        commit_sha = await self._commit_tree_entries(tree_entries, commit_message, None, max_attempts)
+        for old_path, (new_path, blob_sha) in moves.items():
+            self._file_shas[old_path] = None
+            self._file_shas[new_path] = blob_sha
+        return commit_sha
+
+    async def _commit_tree_entries(self, tree_entries, commit_message, expected_shas, max_attempts):
+        """Создать коммит из записей дерева поверх головы ветки и передвинуть ветку"""
+        branch = await self.get_branch()
+        for attempt in range(1, max_attempts + 1):
+            head_sha = await self.get_branch_head()
+            for path, expected_sha in (expected_shas or {}).items():
+                current = await self.get_file(path, ref=head_sha)
+                if (current['sha'] if current else None) != expected_sha:
+                    raise GitHubConflictError(path)
+            base_tree = await self.get_commit_tree(head_sha)
+
+            response = await self.request("POST", f"{self.repo_url}/git/trees", json={
+                "base_tree": base_tree,
+                "tree": tree_entries,
+            })
+            self._raise_for_status(response)
+            tree_sha = response.json()["sha"]
+
+            response = await self.request("POST", f"{self.repo_url}/git/commits", json={
+                "message": commit_message,
+                "tree": tree_sha,
+                "parents": [head_sha],
+            })
+            self._raise_for_status(response)
+            commit_sha = response.json()["sha"]
+
+            response = await self.request("PATCH", f"{self.repo_url}/git/refs/heads/{branch}", json={
+                "sha": commit_sha,
+                "force": False,
+            })
+            if response.status_code == 422 and attempt < max_attempts:
+                logger.warning(f"Ветка {branch} изменилась во время коммита, повтор ({attempt}/{max_attempts})")
+                continue
+            self._raise_for_status(response)
+            return commit_sha
@@ -0,0 +1,399 @@
+import asyncio
+import copy
+import json
+import logging
+from contextvars import ContextVar
+from config import (DATA_DIR_PATH, GAMES_DIR_PATH, GAMES_INDEX_PATH, GAMES_SNAPSHOT_FILE, GITHUB_BRANCH,
+                    GITHUB_CACHE_FILE, GITHUB_CACHE_MAX_ENTRIES, GITHUB_MAX_CONNECTIONS, GITHUB_MAX_WRITE_DEFER,
+                    GITHUB_RATE_LIMIT_RESERVE, RESULT_IMAGES_DIR, SCHEDULE_FILE_PATH)
+from storage.backend import StorageBackend
+from storage.filesystem_storage import FileSystemStorage
+from storage.games_index import (STATS_IMAGE_SUFFIXES, extract_game_number, image_hashes_from_index,
+                                 make_index_row, mark_has_stats, stats_image_name, upsert_row)
+from storage.games_layout import (ARCHIVE_DIRS, archive_file_name, game_file_path, game_file_paths, sharded_path,
+                                  stats_image_path, stats_thumbnail_path)
+from storage.games_snapshot import GamesSnapshot
+from storage.github_client import GitHubAPIError, GitHubClient, GitHubConflictError, git_blob_sha
+from storage.request_scheduler import RequestScheduler
+from storage.response_cache import ResponseCache
+from storage.schedule_merge import merge_schedule
+
+logger = logging.getLogger(__name__)
+
+# Пакет текущей задачи: {'files': {путь: bytes}, 'expected_shas': {путь: sha прочитанной версии},
+# 'documents': {путь: данные документа, сливаемого при конфликте}}
+_pending_batch = ContextVar('pending_batch', default=None)
+
+# Документы, которые при одновременном изменении сливаются с версией из репозитория
+DOCUMENT_MERGERS = {SCHEDULE_FILE_PATH: merge_schedule}
+MERGE_ATTEMPTS = 3
+
+
+class GitHubStorage(StorageBackend):
+    """Хранение данных в репозитории GitHub.
+
+    При ошибках GitHub данные читаются и сохраняются локально (FileSystemStorage).
+    """
+
+    name = "github"
+
+    def __init__(self, token, owner, repo_name):
+        scheduler = RequestScheduler(GITHUB_MAX_CONNECTIONS, GITHUB_RATE_LIMIT_RESERVE, GITHUB_MAX_WRITE_DEFER)
+        self.client = GitHubClient(token, owner, repo_name, scheduler, GITHUB_BRANCH,
+                                   ResponseCache(GITHUB_CACHE_FILE, GITHUB_CACHE_MAX_ENTRIES))
+        self.games_snapshot = GamesSnapshot(GAMES_SNAPSHOT_FILE)
+        self.local = FileSystemStorage()
+        # Версии сливаемых документов, от которых идут правки бота: путь -> {'sha', 'data'}
+        self._bases = {}
+
+    async def close(self):
+        """Закрыть HTTP-сессию GitHub"""
+        await self.client.close()
+
+    def status(self):
+        status = self.client.scheduler.status()
+        if self.client.cache:
+            status['cache_hits'] = self.client.cache.hits
+            status['cache_misses'] = self.client.cache.misses
+        return status
+
+    def begin_batch(self):
+        """Начать пакетный режим: все сохранения текущей задачи копятся до commit_batch"""
+        _pending_batch.set({'files': {}, 'expected_shas': {}, 'documents': {}})
+
+    def discard_batch(self):
+        _pending_batch.set(None)
+
+    async def commit_batch(self, commit_message):
+        """Записать накопленные файлы одним коммитом и выйти из пакетного режима.
+
+        При конфликте с параллельной записью поднимает GitHubConflictError,
+        чтобы вызывающий код мог пересобрать пакет.
+        """
+        batch = _pending_batch.get()
+        _pending_batch.set(None)
+        if not batch or not batch['files']:
+            return True
+
+        files, expected_shas, documents = batch['files'], batch['expected_shas'], batch['documents']
+        # Базовые версии меняются только после успешного коммита: при откате пакета
+        # вызывающий код восстанавливает данные, и они должны остаться согласованными
+        bases = dict(self._bases)
+        try:
+            for attempt in range(1, MERGE_ATTEMPTS + 1):
+                try:
+                    await self.client.commit_files(files, commit_message, expected_shas)
+                    break
+                except GitHubConflictError as e:
+                    if e.path not in documents or attempt == MERGE_ATTEMPTS:
+                        raise
+                    await self._merge_remote(e.path, documents[e.path], bases)
+                    files[e.path] = self._encode_json(documents[e.path])
+                    expected_shas[e.path] = bases[e.path]['sha'] if e.path in bases else None
+
+            for path, data in documents.items():
+                bases[path] = {'sha': git_blob_sha(files[path]), 'data': copy.deepcopy(data)}
+            self._bases = bases
+            logger.info(f"Пакетный коммит: {len(files)} файлов")
+            return True
+        except GitHubConflictError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка при пакетном сохранении в GitHub: {e}")
+            return all(self.local.save_file(path, content) for path, content in files.items())
+
+    async def _write_file(self, file_path, content, commit_message):
+        """Записать файл в репозиторий или отложить его до commit_batch"""
+        await self._write_files({file_path: content}, commit_message)
+
+    async def _write_files(self, files, commit_message, expected_shas=None, git_data=False):
+        """Записать несколько файлов одним коммитом (или отложить их до commit_batch).
+
+        git_data - записывать через Git Data API даже один файл: blob'ы не
+        ограничены размером contents API.
+        """
+        batch = _pending_batch.get()
+        if batch is not None:
+            batch['files'].update(files)
+            for path, sha in (expected_shas or {}).items():
+                batch['expected_shas'].setdefault(path, sha)
+            return
+
+        if len(files) > 1 or expected_shas or git_data:
+            await self.client.commit_files(files, commit_message, expected_shas)
+            return
+
+        (file_path, content), = files.items()
+        await self.client.save_file(file_path, content, commit_message)
+
+    def _encode_json(self, data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+    async def _get_json_file(self, file_path):
+        """Загрузить и разобрать JSON-файл из репозитория"""
+        file_info = await self.client.get_file(file_path)
+        if file_info is None:
+            raise FileNotFoundError(file_path)
+        return json.loads(file_info['content'].decode('utf-8'))
+
+    async def load_json(self, file_path, default):
+        try:
+            file_info = await self.client.get_file(file_path)
+            if file_info is None:
+                raise FileNotFoundError(file_path)
+            data = json.loads(file_info['content'].decode('utf-8'))
+            if file_path in DOCUMENT_MERGERS:
+                self._bases[file_path] = {'sha': file_info['sha'], 'data': copy.deepcopy(data)}
+            return data
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке {file_path} из GitHub: {e}")
+            return await self.local.load_json(file_path, default)
+
+    async def get_change_marks(self):
+        # Один условный запрос листинга data/: sha файлов и git-деревьев поддиректорий
+        return {item['path']: item['sha'] for item in await self.client.list_directory(DATA_DIR_PATH)}
+
+    async def load_cached_json(self, file_path, default):
+        try:
+            file_info = self.client.get_cached_file(file_path)
+            if file_info is None:
+                return await self.local.load_json(file_path, default)
+            data = json.loads(file_info['content'].decode('utf-8'))
+            # Правки, сделанные до загрузки свежей версии, сливаются относительно этой
+            if file_path in DOCUMENT_MERGERS and file_path not in self._bases:
+                self._bases[file_path] = {'sha': file_info['sha'], 'data': copy.deepcopy(data)}
+            return data
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке {file_path} из кэша: {e}")
+            return await self.local.load_json(file_path, default)
+
+    async def save_json(self, file_path, data, commit_message):
+        try:
+            if file_path in DOCUMENT_MERGERS:
+                await self._save_document(file_path, data, commit_message)
+            else:
+                await self._write_file(file_path, self._encode_json(data), commit_message)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении {file_path} в GitHub: {e}")
+            return await self.local.save_json(file_path, data, commit_message)
+
+    async def _save_document(self, file_path, data, commit_message):
+        """Сохранить сливаемый документ с проверкой версии.
+
+        Запись идёт поверх версии, от которой начинались правки. Если документ
+        в репозитории изменился, правки сливаются с текущей версией (data
+        обновляется на месте, чтобы бот продолжал работать со слитыми данными)
+        и запись повторяется.
+        """
+        base = self._bases.get(file_path)
+        batch = _pending_batch.get()
+        if batch is not None:
+            batch['files'][file_path] = self._encode_json(data)
+            batch['expected_shas'].setdefault(file_path, base['sha'] if base else None)
+            batch['documents'][file_path] = data
+            return
+
+        for attempt in range(1, MERGE_ATTEMPTS + 1):
+            base = self._bases.get(file_path)
+            try:
+                sha = await self.client.put_file(
+                    file_path, self._encode_json(data), commit_message, base['sha'] if base else None
+                )
+            except GitHubAPIError as e:
+                if e.status_code not in (409, 422) or attempt == MERGE_ATTEMPTS:
+                    raise
+                await self._merge_remote(file_path, data, self._bases)
+                continue
+            self._bases[file_path] = {'sha': sha, 'data': copy.deepcopy(data)}
+            return
+
+    async def _merge_remote(self, file_path, data, bases):
+        """Слить правки data с текущей версией документа в репозитории"""
+        file_info = await self.client.get_file(file_path)
+        if file_info is None:
+            # Документ удалён в репозитории - он будет создан заново
+            bases.pop(file_path, None)
+            return
+
+        theirs = json.loads(file_info['content'].decode('utf-8'))
+        base = bases.get(file_path)
+        merged, conflicts = DOCUMENT_MERGERS[file_path](base['data'] if base else theirs, data, theirs)
+        if conflicts:
+            logger.warning(f"Конфликтующие правки {file_path}, оставлены правки бота: {conflicts}")
+        logger.info(f"{file_path} изменён в репозитории, правки бота слиты с новой версией")
+
+        data.clear()
+        data.update(merged)
+        self.data_version += 1
+        bases[file_path] = {'sha': file_info['sha'], 'data': theirs}
+
+    async def save_game_result(self, game_data, game_number, commit_message):
+        """Сохранить результат игры и строку индекса одним коммитом"""
+        file_path = game_file_path(game_number)
+        try:
+            # Индекс игр обновляется тем же коммитом
+            index, index_sha = await self._read_games_index()
+            if index is None:
+                index = await self.build_games_index()
+            if any(row["number"] == game_number for row in index["games"]):
+                # Номер уже занят другой записью (параллельное применение изменений)
+                raise GitHubConflictError(file_path)
+            upsert_row(index, make_index_row(game_number, game_data))
+
+            await self._write_files({
+                file_path: self._encode_json(game_data),
+                GAMES_INDEX_PATH: self._encode_json(index),
+            }, commit_message, {GAMES_INDEX_PATH: index_sha})
+            return True
+        except GitHubConflictError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении результата игры: {e}")
+            return self.local._save_local_data(file_path, game_data)
+
+    async def get_all_games(self):
+        """Получить все игры из папки с играми"""
+        try:
+            # Дерево директории + только изменившиеся blob'ы
+            return await self.games_snapshot.sync(self.client, GAMES_DIR_PATH, GITHUB_MAX_CONNECTIONS)
+        except Exception as e:
+            logger.error(f"Ошибка при синхронизации снимка игр, загрузка по файлам: {e}")
+            return await self._get_all_games_by_contents()
+
+    async def _get_all_games_by_contents(self):
+        """Загрузить игры через contents API параллельно (запасной путь)"""
+        try:
+            contents = await self.client.list_directory(GAMES_DIR_PATH)
+            # Блоки архива листаются отдельно: в каждом не больше GAMES_SHARD_SIZE файлов
+            shards = [item['path'] for item in contents if item['type'] == 'dir' and item['name'].isdigit()]
+            for shard_contents in await asyncio.gather(*(self.client.list_directory(path) for path in shards)):
+                contents.extend(shard_contents)
+
+            paths = {}
+            for item in contents:
+                if item['type'] == 'file' and item['name'].startswith("game_") and item['name'].endswith(".json"):
+                    if item['name'] not in paths or item['path'].count("/") > paths[item['name']].count("/"):
+                        paths[item['name']] = item['path']
+            games_data = await self.load_games(list(paths))
+
+            games = []
+            for filename in sorted(paths, key=lambda filename: extract_game_number(filename) or 0):
+                game = {'file_name': filename, 'path': paths[filename]}
+                # Игра без данных тоже добавляется (для подсчета)
+                if filename in games_data:
+                    game['data'] = games_data[filename]
+                games.append(game)
+            return games
+
+        except Exception as e:
+            logger.error(f"Ошибка при получении всех игр: {e}")
+            return []
+
+    async def load_game(self, filename):
+        try:
+            return await self._fetch_game(filename)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке данных игры {filename}: {e}")
+            return None
+
+    async def _fetch_game(self, filename):
+        game_data = self.games_snapshot.get(filename)
+        if game_data is not None:
+            return game_data
+        # Блочная раскладка, затем плоская (файлы, ещё не перенесённые в блоки)
+        for file_path in game_file_paths(filename):
+            file_info = await self.client.get_file(file_path)
+            if file_info is not None:
+                return json.loads(file_info['content'].decode('utf-8'))
+        raise FileNotFoundError(filename)
+
+    async def get_games_with_statistics(self):
+        """Номера игр, для которых в репозитории есть изображения статистики"""
+        try:
+            return set(await self._list_stats_images())
+        except Exception as e:
+            logger.error(f"Ошибка при получении игр со статистикой: {e}")
+            return set()
+
+    async def _list_stats_images(self):
+        """{номер игры: sha blob'а} изображений статистики по рекурсивному дереву data/result"""
+        tree_sha = await self.client.get_directory_sha(RESULT_IMAGES_DIR)
+        if tree_sha is None:
+            return {}
+        images = {}
+        for item in await self.client.get_tree(tree_sha, recursive=True):
+            name = archive_file_name(item['path'])
+            if item['type'] == 'blob' and name and name.endswith(STATS_IMAGE_SUFFIXES):
+                game_number = extract_game_number(name)
+                if game_number not in images or "/" in item['path']:
+                    images[game_number] = item['sha']
+        return images
+
+    async def get_statistics_image_hashes(self):
+        hashes = image_hashes_from_index(await self.get_games_index())
+        # Для изображений без хэшей в индексе берётся sha blob'а из дерева директории
+        known = {game_number for game_number, _, _ in hashes}
+        for game_number, sha in (await self._list_stats_images()).items():
+            if game_number not in known:
+                hashes.append((game_number, sha, None))
+        return hashes
+
+    async def save_statistics_image(self, image_data, game_number, commit_message, thumbnail=None, image_phash=None):
+        """Сохранить изображение со статистикой (blob'ом через Git Data API)"""
+        filename = stats_image_name(game_number)
+        try:
+            files = {stats_image_path(game_number): image_data}
+            if thumbnail is not None:
+                files[stats_thumbnail_path(game_number)] = thumbnail
+            index, index_sha = await self._read_games_index()
+            expected_shas = None
+            if index and mark_has_stats(index, game_number, git_blob_sha(image_data), image_phash):
+                files[GAMES_INDEX_PATH] = self._encode_json(index)
+                expected_shas = {GAMES_INDEX_PATH: index_sha}
+
+            await self._write_files(files, commit_message, expected_shas, git_data=True)
+
+            logger.info(f"Изображение {filename} сохранено через Git Data API")
+            return True
+
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении изображения статистики: {e}")
+            return await self.local.save_statistics_image(image_data, game_number, commit_message, thumbnail,
+                                                          image_phash)
+
+    async def migrate_games_layout(self, commit_message, dry_run=False):
+        moves = {}
+        for archive_dir in ARCHIVE_DIRS:
+            tree_sha = await self.client.get_directory_sha(archive_dir)
+            if tree_sha is None:
+                continue
+            for item in await self.client.get_tree(tree_sha):
+                new_path = sharded_path(archive_dir, item['path'])
+                if item['type'] == 'blob' and new_path:
+                    moves[f"{archive_dir}/{item['path']}"] = (new_path, item['sha'])
+
+        if moves and not dry_run:
+            # Перенос одним коммитом: дерево ссылается на те же blob'ы
+            await self.client.move_files(moves, commit_message)
+        return {old_path: new_path for old_path, (new_path, _) in moves.items()}
+
+    async def _read_games_index(self):
+        """Прочитать индекс игр (с учётом пакета текущей задачи): (индекс или None, sha)"""
+        batch = _pending_batch.get()
+        if batch and GAMES_INDEX_PATH in batch['files']:
+            index = json.loads(batch['files'][GAMES_INDEX_PATH].decode('utf-8'))
+            return index, batch['expected_shas'].get(GAMES_INDEX_PATH)
+
+        file_info = await self.client.get_file(GAMES_INDEX_PATH)
+        if file_info is None:
+            return None, None
+        return json.loads(file_info['content'].decode('utf-8')), file_info['sha']
+
+    async def get_games_index(self):
+        index, _ = await self._read_games_index()
+        return index
+
+    async def save_games_index(self, index, commit_message):
+        await self._write_file(GAMES_INDEX_PATH, self._encode_json(index), commit_message)
+        return True
@@ -0,0 +1,115 @@
+import logging
+import os
+from storage.games_index import extract_game_number
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # необязательная зависимость: без неё изменения находятся по stat()
+    INotify = None
+
+logger = logging.getLogger(__name__)
+
+
+def scan_archive(archive_dir, suffixes):
+    """{номер игры: os.DirEntry} файлов архива в плоской раскладке и в блоках (блочный файл важнее)"""
+    files = {}
+    if not os.path.isdir(archive_dir):
+        return files
+    for entry in os.scandir(archive_dir):
+        if entry.is_dir() and entry.name.isdigit():
+            candidates = [(child, True) for child in os.scandir(entry.path)]
+        else:
+            candidates = [(entry, False)]
+        for candidate, in_shard in candidates:
+            game_number = extract_game_number(candidate.name)
+            if game_number and candidate.name.endswith(suffixes) and (in_shard or game_number not in files):
+                files[game_number] = candidate
+    return files
+
+
+class _DirectoryWatcher:
+    """Наблюдение за директориями архива через inotify"""
+
+    MASK = None if INotify is None else (flags.CREATE | flags.DELETE | flags.MODIFY | flags.MOVED_FROM |
+                                         flags.MOVED_TO | flags.DELETE_SELF)
+
+    def __init__(self):
+        self.inotify = INotify()
+        self._watched = set()
+
+    def watch(self, dir_path):
+        if dir_path not in self._watched:
+            self.inotify.add_watch(dir_path, self.MASK)
+            self._watched.add(dir_path)
+
+    def changed(self):
+        """Были ли события с прошлой проверки (без ожидания)"""
+        return bool(self.inotify.read(timeout=0))
+
+
+class LocalArchiveCache:
+    """Файлы локального архива с разобранным содержимым, перечитываемые только при изменении.
+
+    Для каждого файла запоминается (mtime, размер, inode): при повторном
+    обращении разбираются только новые и изменившиеся файлы, остальные
+    берутся из памяти. С watch=True (нужен пакет inotify_simple) архив
+    даже не обходится, пока inotify не сообщит об изменениях.
+    """
+
+    def __init__(self, archive_dir, suffixes, parse, watch=False):
+        self.archive_dir = archive_dir
+        self.suffixes = suffixes
+        self.parse = parse
+        self._entries = {}  # номер игры -> {'path', 'key', 'value', 'error'}
+        self.version = 0  # увеличивается при любом изменении набора файлов или их содержимого
+        self._watcher = None
+        self._watching = False
+        if watch:
+            if INotify is None:
+                logger.warning("Пакет inotify_simple не установлен, изменения архива проверяются по stat()")
+            else:
+                self._watcher = _DirectoryWatcher()
+
+    def files(self):
+        """{номер игры: {'path', 'value', 'error'}} - value разобрано parse, error - ошибка разбора"""
+        if not self._watching or self._watcher.changed():
+            self._rescan()
+        return self._entries
+
+    def _rescan(self):
+        entries = {}
+        parsed = 0
+        for game_number, dir_entry in scan_archive(self.archive_dir, self.suffixes).items():
+            stat = dir_entry.stat()
+            key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            cached = self._entries.get(game_number)
+            if cached and cached['path'] == dir_entry.path and cached['key'] == key:
+                entries[game_number] = cached
+                continue
+
+            entry = {'path': dir_entry.path, 'key': key, 'value': None, 'error': None}
+            try:
+                entry['value'] = self.parse(dir_entry.path)
+            except Exception as e:
+                entry['error'] = e
+            entries[game_number] = entry
+            parsed += 1
+
+        if parsed or entries.keys() != self._entries.keys():
+            logger.debug(f"{self.archive_dir}: перечитано файлов {parsed} из {len(entries)}")
+            self.version += 1
+        self._entries = entries
+        self._watch_dirs()
+
+    def _watch_dirs(self):
+        if self._watcher is None or not os.path.isdir(self.archive_dir):
+            return
+        try:
+            self._watcher.watch(self.archive_dir)
+            for entry in os.scandir(self.archive_dir):
+                if entry.is_dir() and entry.name.isdigit():
+                    self._watcher.watch(entry.path)
+            self._watching = True
+        except OSError as e:
+            logger.error(f"Не удалось наблюдать за {self.archive_dir}: {e}")
+            self._watching = False
@@ -0,0 +1,23 @@
+import asyncio
+
+
+async def fetch_all(keys, fetch, concurrency, timeout):
+    """Выполнить fetch(key) для всех ключей параллельно, не более concurrency одновременно.
+
+    Возвращает (результаты {ключ: значение}, ошибки {ключ: исключение}). Ошибка
+    или превышение timeout (секунд) для одного ключа не прерывает остальные.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results, errors = {}, {}
+
+    async def run(key):
+        async with semaphore:
+            try:
+                results[key] = await asyncio.wait_for(fetch(key), timeout)
+            except asyncio.TimeoutError:
+                errors[key] = TimeoutError(f"нет ответа за {timeout} с")
+            except Exception as e:
+                errors[key] = e
+
+    await asyncio.gather(*(run(key) for key in keys))
+    return results, errors
@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: чем меньше значение, тем раньше запрос получает соединение
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Пауза после вторичного лимита без Retry-After (рекомендация GitHub - не меньше минуты)
+SECONDARY_LIMIT_PAUSE = 60
+
+
+class GitHubRateLimitError(Exception):
+    """Лимит запросов GitHub исчерпан, запрос не может быть выполнен сейчас"""
+
+    def __init__(self, wait_seconds):
+        super().__init__(f"Лимит запросов GitHub исчерпан, повторите через {int(wait_seconds)} с")
+        self.wait_seconds = wait_seconds
+
+
+class RequestScheduler:
+    """Очередь запросов к GitHub API с учётом лимитов.
+
+    Все запросы клиента проходят через run(). Свободные соединения
+    отдаются сначала интерактивным запросам (чтение для меню), затем фоновым
+    (запись). Фоновые запросы выполняются по одному. Остаток лимита берётся из
+    заголовков X-RateLimit-*: когда он опускается до резерва, фоновые запросы
+    откладываются до сброса лимита, а резерв остаётся для интерактивных.
+    """
+
+    def __init__(self, max_concurrent, quota_reserve, max_defer):
+        self.max_concurrent = max_concurrent
+        self.quota_reserve = quota_reserve
+        self.max_defer = max_defer
+
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0
+
+        self._active = 0
+        self._waiters = []  # куча (приоритет, порядковый номер, future)
+        self._order = itertools.count()
+        self._background_lock = asyncio.Lock()
+        self._background_waiting = 0
+        self._low_quota_logged = False
+
+    def _quota_delay(self, priority):
+        """Сколько секунд запрос с данным приоритетом должен подождать лимит"""
+        now = time.time()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is not None and self.reset_at and now < self.reset_at:
+            reserve = self.quota_reserve if priority == BACKGROUND else 0
+            if self.remaining <= reserve:
+                return self.reset_at - now
+        return 0
+
+    async def _wait_for_quota(self, priority):
+        delay = self._quota_delay(priority)
+        if not delay:
+            return
+        # Интерактивный запрос не ждёт - вызывающий код возьмёт локальные данные
+        if priority == INTERACTIVE or delay > self.max_defer:
+            raise GitHubRateLimitError(delay)
+        logger.warning(f"Фоновый запрос к GitHub отложен на {int(delay)} с из-за лимита")
+        await asyncio.sleep(delay)
+
+    async def _acquire_slot(self, priority):
+        if self._active < self.max_concurrent and not self.queue_depth():
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Слот мог быть передан нам одновременно с отменой - возвращаем его
+            if future.done() and not future.cancelled():
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Слот переходит следующему запросу, счётчик активных не меняется
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    async def run(self, priority, send):
+        """Выполнить запрос send() с учётом приоритета и лимитов"""
+        if priority != BACKGROUND:
+            return await self._run(priority, send)
+
+        self._background_waiting += 1
+        try:
+            await self._background_lock.acquire()
+        finally:
+            self._background_waiting -= 1
+        try:
+            return await self._run(priority, send)
+        finally:
+            self._background_lock.release()
+
+    async def _run(self, priority, send):
+        await self._wait_for_quota(priority)
+        await self._acquire_slot(priority)
+        try:
+            response = await send()
+        finally:
+            self._release_slot()
+        self.observe(response)
+        return response
+
+    def observe(self, response):
+        """Обновить состояние лимита по заголовкам ответа"""
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers:
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+            self.reset_at = int(headers.get("X-RateLimit-Reset", self.reset_at or 0))
+
+            if self.remaining <= self.quota_reserve and not self._low_quota_logged:
+                logger.warning(f"Лимит GitHub API почти исчерпан: осталось {self.remaining} из {self.limit}")
+                self._low_quota_logged = True
+            elif self.remaining > self.quota_reserve:
+                self._low_quota_logged = False
+
+        if response.status_code in (403, 429) and self.is_rate_limited(response):
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                self.blocked_until = time.time() + int(retry_after)
+            elif self.remaining == 0 and self.reset_at:
+                self.blocked_until = self.reset_at
+            else:
+                self.blocked_until = time.time() + SECONDARY_LIMIT_PAUSE
+            logger.warning(f"GitHub ограничил запросы до {time.strftime('%H:%M:%S', time.localtime(self.blocked_until))}")
+
+    def is_rate_limited(self, response):
+        """Ответ 403/429 вызван лимитом запросов, а не правами доступа"""
+        return (response.status_code == 429 or "Retry-After" in response.headers or
+                response.headers.get("X-RateLimit-Remaining") == "0" or
+                "rate limit" in response.text.lower())
+
+    def queue_depth(self, priority=None):
+        """Число запросов, ожидающих соединения"""
+        return sum(
+            1 for waiter_priority, _, future in self._waiters
+            if not future.done() and (priority is None or waiter_priority == priority)
+        )
+
+    def status(self):
+        """Состояние лимита и очереди для операторов"""
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_at': self.reset_at,
+            'blocked_until': self.blocked_until if self.blocked_until > time.time() else None,
+            'active': self._active,
+            'queued_interactive': self.queue_depth(INTERACTIVE),
+            'queued_background': self.queue_depth(BACKGROUND) + self._background_waiting,
+        }
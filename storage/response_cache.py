@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Кэш ответов GitHub API для условных запросов (ETag / Last-Modified).
+
+    Хранит для каждого ключа (URL запроса) валидаторы и тело последнего ответа.
+    При ответе 304 тело берётся из кэша, а запрос не расходует лимит API.
+    Между перезапусками кэш сохраняется в JSON-файл. Хранится не больше
+    max_entries ответов: при переполнении вытесняются давно не использованные.
+    """
+
+    def __init__(self, file_path=None, max_entries=None):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.file_path or not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                self._entries = OrderedDict(json.load(f))
+            self._evict()
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке кэша ответов {self.file_path}: {e}")
+            self._entries = OrderedDict()
+
+    def _evict(self):
+        """Вытеснить давно не использованные ответы сверх max_entries"""
+        if self.max_entries is None:
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self):
+        """Сохранить кэш на диск, если он изменился"""
+        if not self.file_path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении кэша ответов {self.file_path}: {e}")
+
+    def conditional_headers(self, key):
+        """Заголовки If-None-Match / If-Modified-Since для ключа"""
+        entry = self._entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers["If-None-Match"] = entry['etag']
+        if entry.get('last_modified'):
+            headers["If-Modified-Since"] = entry['last_modified']
+        return headers
+
+    def get(self, key, default=None):
+        """Тело закэшированного ответа (после 304).
+
+        Пока шёл запрос, ответ мог быть вытеснен - тогда возвращается default
+        (тело, запомненное вызывающим кодом вместе с условными заголовками).
+        """
+        self.hits += 1
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry['body']
+
+    def peek(self, key):
+        """Тело последнего ответа без запроса к API (None, если его нет)"""
+        entry = self._entries.get(key)
+        return entry['body'] if entry else None
+
+    def store(self, key, response, body):
+        """Запомнить тело ответа 200 вместе с валидаторами"""
+        self.misses += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        self._entries[key] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+        }
+        self._entries.move_to_end(key)
+        self._dirty = True
+        self._evict()
+
+    def discard(self, key):
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
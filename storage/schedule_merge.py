@@ -0,0 +1,119 @@
+import copy
+
+# Трёхстороннее слияние расписания (schedule.json) по записям игр.
+# base - версия, которую бот загрузил, ours - версия с правками бота,
+# theirs - текущая версия в репозитории. Правки бота переносятся на theirs:
+# игра определяется этапом, хозяевами, гостями и порядковым номером такой пары
+# в этапе, изменения сливаются по полям. Если одно и то же поле изменено по-разному,
+# побеждает правка бота, а конфликт возвращается вызывающему коду для журнала.
+
+
+def _game_records(schedule):
+    """{(этап, хозяева, гости, n): игра} для всех игр расписания"""
+    records = {}
+    for stage in schedule.get("stages", []):
+        counts = {}
+        for game in stage.get("games", []):
+            pair = (stage.get("name"), game.get("teamHome"), game.get("teamAway"))
+            records[pair + (counts.get(pair, 0),)] = game
+            counts[pair] = counts.get(pair, 0) + 1
+    return records
+
+
+def _find_stage(schedule, stage_name):
+    for stage in schedule.get("stages", []):
+        if stage.get("name") == stage_name:
+            return stage
+    return None
+
+
+def _insert_game(result, result_records, ours, ours_keys, key, game):
+    """Вставить добавленную игру после той, за которой она стоит в ours"""
+    stage = _find_stage(result, key[0])
+    if stage is None:
+        stage = {"name": key[0], "games": []}
+        result.setdefault("stages", []).append(stage)
+
+    position = 0
+    ours_games = _find_stage(ours, key[0]).get("games", [])
+    index = next(i for i, ours_game in enumerate(ours_games) if ours_game is game)
+    if index > 0:
+        previous = result_records.get(ours_keys[id(ours_games[index - 1])])
+        for i, result_game in enumerate(stage["games"]):
+            if result_game is previous:
+                position = i + 1
+                break
+        else:
+            position = len(stage["games"])
+
+    new_game = copy.deepcopy(game)
+    stage["games"].insert(position, new_game)
+    result_records[key] = new_game
+
+
+def _remove_game(result, key, game):
+    stage = _find_stage(result, key[0])
+    stage["games"] = [result_game for result_game in stage["games"] if result_game is not game]
+
+
+def merge_schedule(base, ours, theirs):
+    """Перенести правки ours (относительно base) на theirs.
+
+    Возвращает (слитое расписание, список конфликтов). Аргументы не изменяются.
+    """
+    result = copy.deepcopy(theirs)
+    conflicts = []
+
+    # Поля верхнего уровня (сезон и т.п.)
+    for field in set(base) | set(ours):
+        if field == "stages" or base.get(field) == ours.get(field):
+            continue
+        if result.get(field) not in (base.get(field), ours.get(field)):
+            conflicts.append(field)
+        if field in ours:
+            result[field] = copy.deepcopy(ours[field])
+        else:
+            result.pop(field, None)
+
+    base_records = _game_records(base)
+    ours_records = _game_records(ours)
+    result_records = _game_records(result)
+    ours_keys = {id(game): key for key, game in ours_records.items()}
+
+    for key in list(ours_records) + [key for key in base_records if key not in ours_records]:
+        base_game, ours_game = base_records.get(key), ours_records.get(key)
+        if base_game == ours_game:
+            continue
+        result_game = result_records.get(key)
+
+        if ours_game is None:
+            # Игра удалена ботом
+            if result_game is not None:
+                if result_game != base_game:
+                    conflicts.append(key)
+                _remove_game(result, key, result_game)
+                del result_records[key]
+        elif result_game is None:
+            # Игра добавлена ботом (или удалена в репозитории, но изменена ботом)
+            if base_game is not None:
+                conflicts.append(key)
+            _insert_game(result, result_records, ours, ours_keys, key, ours_game)
+        elif base_game is None:
+            # Одна и та же игра добавлена с обеих сторон
+            if result_game != ours_game:
+                conflicts.append(key)
+                result_game.clear()
+                result_game.update(copy.deepcopy(ours_game))
+        else:
+            # Игра изменена ботом - сливаем по полям
+            for field in set(base_game) | set(ours_game):
+                if base_game.get(field) == ours_game.get(field):
+                    continue
+                if result_game.get(field) not in (base_game.get(field), ours_game.get(field)):
+                    conflicts.append(key + (field,))
+                if field in ours_game:
+                    result_game[field] = copy.deepcopy(ours_game[field])
+                else:
+                    result_game.pop(field, None)
+
+    return result, conflicts
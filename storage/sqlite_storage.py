@@ -0,0 +1,335 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from config import (CONFIG_FILE_PATH, GAMES_INDEX_PATH, RESULT_IMAGES_DIR, SCHEDULE_FILE_PATH, TEAMS_FILE_PATH,
+                    VENUES_FILE_PATH)
+from storage.backend import StorageBackend
+from storage.filesystem_storage import FileSystemStorage
+from storage.games_index import (GAMES_INDEX_VERSION, STATS_IMAGE_SUFFIXES, extract_game_number,
+                                 image_hashes_from_index, make_index_row)
+from storage.games_layout import game_file_name, game_file_path, stats_thumbnail_path
+from storage.github_client import git_blob_sha
+from storage.local_archive import scan_archive
+
+logger = logging.getLogger(__name__)
+
+# Колонки таблицы games, совпадающие с полями строки индекса игр
+INDEX_COLUMNS = ("number", "league", "team_a", "team_b", "score", "date", "time", "venue", "game_type", "has_stats")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    number INTEGER PRIMARY KEY,
+    league TEXT NOT NULL DEFAULT '',
+    team_a TEXT NOT NULL DEFAULT '',
+    team_b TEXT NOT NULL DEFAULT '',
+    score TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    time TEXT NOT NULL DEFAULT '',
+    venue TEXT NOT NULL DEFAULT '',
+    game_type TEXT NOT NULL DEFAULT 'regular',
+    has_stats INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_league ON games (league);
+CREATE INDEX IF NOT EXISTS games_team_a ON games (team_a);
+CREATE INDEX IF NOT EXISTS games_team_b ON games (team_b);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+CREATE TABLE IF NOT EXISTS statistics_images (
+    number INTEGER PRIMARY KEY,
+    image BLOB NOT NULL,
+    thumbnail BLOB,
+    sha TEXT,
+    phash TEXT
+);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """Хранение данных в базе SQLite для локальных и тестовых развёртываний.
+
+    Документы хранятся как JSON, игры - строками таблицы games с индексами по
+    номеру, лиге, командам и дате, поэтому списки и фильтры не требуют разбора
+    всех игр. При первом запуске в пустую базу импортируются локальные файлы.
+
+    Запросы к базе блокирующие, поэтому выполняются в отдельном потоке,
+    которому принадлежит соединение; цикл событий их только ожидает. Поток
+    один - запросы выполняются по очереди, как и с одним соединением.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._executor.submit(self._open).result()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        if self._is_empty():
+            self._import_local_files()
+
+    def _run(self, func, *args):
+        """Выполнить func(*args) в потоке базы"""
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def close(self):
+        await self._run(self.conn.close)
+        self._executor.shutdown()
+
+    def _migrate(self):
+        """Добавить колонки, появившиеся после создания базы, и заполнить sha старых изображений"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(statistics_images)")}
+        for column, column_type in (("thumbnail", "BLOB"), ("sha", "TEXT"), ("phash", "TEXT")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE statistics_images ADD COLUMN {column} {column_type}")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS statistics_images_sha ON statistics_images (sha)")
+
+        # Изображения читаются по одному, чтобы не держать в памяти весь архив
+        numbers = [
+            row["number"] for row in self.conn.execute("SELECT number FROM statistics_images WHERE sha IS NULL")
+        ]
+        with self.conn:
+            for number in numbers:
+                image = self.conn.execute(
+                    "SELECT image FROM statistics_images WHERE number = ?", (number,)
+                ).fetchone()["image"]
+                self.conn.execute(
+                    "UPDATE statistics_images SET sha = ? WHERE number = ?", (git_blob_sha(image), number)
+                )
+        if numbers:
+            logger.info(f"Посчитаны хэши изображений статистики: {len(numbers)}")
+
+    def _is_empty(self):
+        return (self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 0 and
+                self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 0)
+
+    def _import_local_files(self):
+        """Перенести в базу данные из локальных JSON-файлов и изображения статистики"""
+        local = FileSystemStorage()
+        try:
+            with self.conn:
+                for file_path in (CONFIG_FILE_PATH, TEAMS_FILE_PATH, VENUES_FILE_PATH, SCHEDULE_FILE_PATH):
+                    data = local._load_local_data(file_path, None)
+                    if data is not None:
+                        self._put_document(file_path, data)
+
+                # Изображения - в statistics_images, по которой считается has_stats игр
+                images = self._import_local_images(local._load_local_data(GAMES_INDEX_PATH, None))
+                games = [game for game in local._get_local_games() if 'data' in game]
+                for game in games:
+                    game_number = extract_game_number(game['file_name'])
+                    if game_number:
+                        self._put_game(game_number, game['data'], game_number in images)
+            logger.info(f"В базу {self.db_path} импортировано игр: {len(games)}, изображений: {len(images)}")
+        except Exception as e:
+            logger.error(f"Ошибка при импорте локальных файлов в {self.db_path}: {e}")
+
+    def _import_local_images(self, index):
+        """Записать изображения статистики из data/result, вернуть номера их игр.
+
+        Перцептивный хэш берётся из локального индекса игр, если он посчитан
+        для того же изображения.
+        """
+        phashes = {(game_number, sha): phash for game_number, sha, phash in image_hashes_from_index(index)}
+        images = scan_archive(RESULT_IMAGES_DIR, STATS_IMAGE_SUFFIXES)
+        for game_number, dir_entry in images.items():
+            with open(dir_entry.path, 'rb') as f:
+                image_data = f.read()
+            thumbnail = None
+            if os.path.exists(stats_thumbnail_path(game_number)):
+                with open(stats_thumbnail_path(game_number), 'rb') as f:
+                    thumbnail = f.read()
+            sha = git_blob_sha(image_data)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO statistics_images (number, image, thumbnail, sha, phash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (game_number, image_data, thumbnail, sha, phashes.get((game_number, sha)))
+            )
+        return set(images)
+
+    def _put_document(self, file_path, data):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (path, data) VALUES (?, ?)",
+            (file_path, json.dumps(data, ensure_ascii=False))
+        )
+
+    def _put_game(self, game_number, game_data, has_stats=False):
+        row = make_index_row(game_number, game_data, has_stats)
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO games ({', '.join(INDEX_COLUMNS)}, data) "
+            f"VALUES ({', '.join('?' * (len(INDEX_COLUMNS) + 1))})",
+            [row[column] for column in INDEX_COLUMNS] + [json.dumps(game_data, ensure_ascii=False)]
+        )
+
+    def _row_to_index_row(self, row):
+        index_row = {column: row[column] for column in INDEX_COLUMNS}
+        index_row["file"] = game_file_name(row['number'])
+        index_row["has_stats"] = bool(row["has_stats"])
+        return index_row
+
+    def _load_json(self, file_path, default):
+        row = self.conn.execute("SELECT data FROM documents WHERE path = ?", (file_path,)).fetchone()
+        return json.loads(row["data"]) if row else default
+
+    async def load_json(self, file_path, default):
+        try:
+            return await self._run(self._load_json, file_path, default)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке {file_path} из базы: {e}")
+            return default
+
+    def _save_json(self, file_path, data):
+        with self.conn:
+            self._put_document(file_path, data)
+
+    async def save_json(self, file_path, data, commit_message):
+        try:
+            await self._run(self._save_json, file_path, data)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении {file_path} в базу: {e}")
+            return False
+
+    def _get_all_games(self):
+        return [
+            {
+                'file_name': game_file_name(row['number']),
+                'data': json.loads(row['data']),
+                'path': game_file_path(row['number']),
+            }
+            for row in self.conn.execute("SELECT number, data FROM games ORDER BY number")
+        ]
+
+    async def get_all_games(self):
+        try:
+            return await self._run(self._get_all_games)
+        except Exception as e:
+            logger.error(f"Ошибка при получении игр из базы: {e}")
+            return []
+
+    def _load_game(self, filename):
+        row = self.conn.execute(
+            "SELECT data FROM games WHERE number = ?", (extract_game_number(filename),)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    async def load_game(self, filename):
+        try:
+            return await self._run(self._load_game, filename)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке данных игры {filename}: {e}")
+            return None
+
+    def _save_game_result(self, game_data, game_number):
+        with self.conn:
+            has_stats = self.conn.execute(
+                "SELECT 1 FROM statistics_images WHERE number = ?", (game_number,)
+            ).fetchone() is not None
+            self._put_game(game_number, game_data, has_stats)
+
+    async def save_game_result(self, game_data, game_number, commit_message):
+        try:
+            await self._run(self._save_game_result, game_data, game_number)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении результата игры в базу: {e}")
+            return False
+
+    def _get_games_with_statistics(self):
+        return {row["number"] for row in self.conn.execute("SELECT number FROM statistics_images")}
+
+    async def get_games_with_statistics(self):
+        try:
+            return await self._run(self._get_games_with_statistics)
+        except Exception as e:
+            logger.error(f"Ошибка при получении игр со статистикой из базы: {e}")
+            return set()
+
+    def _save_statistics_image(self, image_data, game_number, thumbnail, image_phash):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO statistics_images (number, image, thumbnail, sha, phash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (game_number, image_data, thumbnail, git_blob_sha(image_data), image_phash)
+            )
+            self.conn.execute("UPDATE games SET has_stats = 1 WHERE number = ?", (game_number,))
+
+    async def save_statistics_image(self, image_data, game_number, commit_message, thumbnail=None, image_phash=None):
+        try:
+            await self._run(self._save_statistics_image, image_data, game_number, thumbnail, image_phash)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении изображения статистики в базу: {e}")
+            return False
+
+    def _get_statistics_image_hashes(self):
+        return [
+            (row["number"], row["sha"], row["phash"])
+            for row in self.conn.execute("SELECT number, sha, phash FROM statistics_images")
+        ]
+
+    async def get_statistics_image_hashes(self):
+        try:
+            return await self._run(self._get_statistics_image_hashes)
+        except Exception as e:
+            logger.error(f"Ошибка при получении хэшей изображений из базы: {e}")
+            return []
+
+    def _get_games_index(self):
+        rows = [
+            self._row_to_index_row(row)
+            for row in self.conn.execute(f"SELECT {', '.join(INDEX_COLUMNS)} FROM games ORDER BY number")
+        ]
+        next_number = rows[-1]["number"] + 1 if rows else 1
+        return {"version": GAMES_INDEX_VERSION, "next_number": next_number, "games": rows}
+
+    async def get_games_index(self):
+        """Индекс игр строится по колонкам таблицы, без разбора данных игр"""
+        return await self._run(self._get_games_index)
+
+    async def save_games_index(self, index, commit_message):
+        # Индекс - это сама таблица games, отдельного файла нет
+        return True
+
+    def _find_games(self, query, params):
+        return [self._row_to_index_row(row) for row in self.conn.execute(query, params)]
+
+    async def find_games(self, league=None, team=None, date=None, without_stats=False, limit=None):
+        conditions, params = [], []
+        if league:
+            conditions.append("league = ?")
+            params.append(league)
+        if team:
+            conditions.append("(team_a = ? OR team_b = ?)")
+            params.extend([team, team])
+        if date:
+            conditions.append("date = ?")
+            params.append(date)
+        if without_stats:
+            conditions.append("has_stats = 0")
+
+        query = f"SELECT {', '.join(INDEX_COLUMNS)} FROM games"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY number DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        try:
+            return await self._run(self._find_games, query, params)
+        except Exception as e:
+            logger.error(f"Ошибка при поиске игр в базе: {e}")
+            return []
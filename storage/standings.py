@@ -0,0 +1,132 @@
+# Турнирная таблица (data/standings.json): по каждой лиге победы, поражения,
+# набранные и пропущенные очки команд и результаты личных встреч. Учитываются
+# игры регулярного сезона. Таблица обновляется по одной игре тем же коммитом,
+# что и результат, а при расхождении с индексом игр досчитывается или
+# пересобирается по строкам индекса, без разбора файлов архива.
+
+STANDINGS_VERSION = 1
+
+# Очки в таблице: 2 за победу, 1 за поражение (как в регламентах FIBA)
+POINTS_FOR_WIN = 2
+POINTS_FOR_LOSS = 1
+
+
+def empty_standings():
+    return {"version": STANDINGS_VERSION, "games": [], "leagues": {}}
+
+
+def _empty_record():
+    return {"wins": 0, "losses": 0, "points_for": 0, "points_against": 0}
+
+
+def parse_score(score):
+    """Счёт "73:60" -> (73, 60) или None"""
+    try:
+        home, away = (int(part) for part in str(score).split(":"))
+        return home, away
+    except ValueError:
+        return None
+
+
+def _add_to_record(record, scored, conceded):
+    if scored > conceded:
+        record["wins"] += 1
+    else:
+        record["losses"] += 1
+    record["points_for"] += scored
+    record["points_against"] += conceded
+
+
+def add_game(standings, row):
+    """Учесть игру (строку индекса игр). Возвращает False, если игра уже учтена"""
+    if row["number"] in standings["games"]:
+        return False
+    standings["games"].append(row["number"])
+
+    score = parse_score(row["score"])
+    if row["game_type"] != "regular" or score is None or score[0] == score[1]:
+        return True
+    team_a, team_b = row["team_a"], row["team_b"]
+    if not team_a or not team_b:
+        return True
+
+    league = standings["leagues"].setdefault(row["league"], {"teams": {}, "head_to_head": {}})
+    for team, opponent, (scored, conceded) in ((team_a, team_b, score), (team_b, team_a, score[::-1])):
+        _add_to_record(league["teams"].setdefault(team, _empty_record()), scored, conceded)
+        head_to_head = league["head_to_head"].setdefault(team, {})
+        _add_to_record(head_to_head.setdefault(opponent, _empty_record()), scored, conceded)
+    return True
+
+
+def build_standings(rows):
+    """Собрать таблицу по строкам индекса игр"""
+    standings = empty_standings()
+    for row in sorted(rows, key=lambda r: r["number"]):
+        add_game(standings, row)
+    return standings
+
+
+def sync_standings(standings, rows):
+    """Привести таблицу в соответствие с индексом игр: (таблица, изменилась ли).
+
+    Новые игры досчитываются по одной. Если учтена игра, которой в индексе
+    уже нет (или таблицы нет, или она в старом формате), таблица пересобирается.
+    """
+    numbers = {row["number"] for row in rows}
+    if (not standings or standings.get("version") != STANDINGS_VERSION or
+            not numbers.issuperset(standings["games"])):
+        return build_standings(rows), True
+
+    counted = set(standings["games"])
+    changed = False
+    for row in sorted(rows, key=lambda r: r["number"]):
+        if row["number"] not in counted:
+            changed |= add_game(standings, row)
+    return standings, changed
+
+
+def _table_points(record):
+    return record["wins"] * POINTS_FOR_WIN + record["losses"] * POINTS_FOR_LOSS
+
+
+def _head_to_head_key(league, team, rivals):
+    """Очки и разница в личных встречах с командами, набравшими столько же очков"""
+    total = _empty_record()
+    for rival in rivals:
+        record = league["head_to_head"].get(team, {}).get(rival)
+        if record:
+            for field in total:
+                total[field] += record[field]
+    return _table_points(total), total["points_for"] - total["points_against"]
+
+
+def league_table(standings, league_name, teams=()):
+    """Строки таблицы лиги в порядке мест.
+
+    teams - команды лиги (попадают в таблицу и без сыгранных игр). Порядок:
+    очки, затем личные встречи между командами с равными очками, общая
+    разница, набранные очки.
+    """
+    league = standings["leagues"].get(league_name, {"teams": {}, "head_to_head": {}})
+    rows = []
+    for team in list(teams) + [team for team in league["teams"] if team not in teams]:
+        record = league["teams"].get(team, _empty_record())
+        rows.append(dict(
+            record,
+            team=team,
+            played=record["wins"] + record["losses"],
+            points=_table_points(record),
+            diff=record["points_for"] - record["points_against"],
+        ))
+
+    tied = {}
+    for row in rows:
+        tied.setdefault(row["points"], []).append(row["team"])
+
+    def sort_key(row):
+        rivals = [team for team in tied[row["points"]] if team != row["team"]]
+        h2h_points, h2h_diff = _head_to_head_key(league, row["team"], rivals)
+        return -row["points"], -h2h_points, -h2h_diff, -row["diff"], -row["points_for"], row["team"]
+
+    rows.sort(key=sort_key)
+    return rows
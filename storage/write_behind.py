@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Отложенная запись документа, объединяющая частые изменения в один коммит.
+
+    queue() запоминает последнюю версию данных и описание изменения и сразу
+    возвращает управление. Через delay секунд после первого изменения в окне
+    все накопленные изменения сохраняются одним вызовом save(data, message),
+    а в сообщении коммита перечисляются все описания.
+    """
+
+    def __init__(self, save, delay, title):
+        self.save = save
+        self.delay = delay
+        self.title = title
+        self._data = None
+        self._changes = []
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self):
+        return len(self._changes)
+
+    def queue(self, data, change_description):
+        """Поставить изменение в очередь на запись"""
+        self._data = data
+        self._changes.append(change_description)
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    def take(self):
+        """Забрать накопленные изменения (их запишет вызывающий код)"""
+        self._cancel_timer()
+        changes, self._changes = self._changes, []
+        return changes
+
+    async def flush(self):
+        """Записать накопленные изменения сейчас"""
+        self._cancel_timer()
+        async with self._lock:
+            changes, self._changes = self._changes, []
+            if not changes:
+                return True
+
+            success = await self.save(self._data, self.commit_message(changes))
+            if success:
+                logger.info(f"{self.title}: записано изменений одним коммитом - {len(changes)}")
+            else:
+                logger.error(f"{self.title}: не удалось записать изменения ({len(changes)})")
+            return success
+
+    def commit_message(self, changes):
+        if len(changes) == 1:
+            return changes[0]
+        return f"{self.title} ({len(changes)}):\n\n" + "\n".join(f"- {change}" for change in changes)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        self._timer = None
+        await self.flush()
+
+    def _cancel_timer(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+from config import DATA_DIR_PATH
+
+logger = logging.getLogger(__name__)
+
+# Больше коммитов GitHub в payload push не передаёт - список файлов может быть неполным
+PUSH_PAYLOAD_MAX_COMMITS = 20
+MAX_BODY_SIZE = 5 * 1024 * 1024
+MAX_HEADER_LINES = 100
+REQUEST_TIMEOUT = 10.0  # секунд на чтение запроса целиком
+
+RESPONSE_REASONS = {
+    200: "OK", 202: "Accepted", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+    404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout", 413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+}
+
+
+def sign_payload(secret, body):
+    """Значение заголовка X-Hub-Signature-256 для тела запроса"""
+    return "sha256=" + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, signature):
+    """Проверить подпись webhook'а (X-Hub-Signature-256)"""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+def changed_paths(payload, branch=None):
+    """Пути, изменённые push'ем в ветку branch (по умолчанию - основная ветка репозитория).
+
+    Для push в другую ветку возвращается пустое множество. Если список файлов
+    может быть неполным (принудительный push, слишком много коммитов), изменённой
+    считается вся директория данных.
+    """
+    branch = branch or payload.get("repository", {}).get("default_branch")
+    if payload.get("ref") != f"refs/heads/{branch}":
+        return set()
+
+    commits = payload.get("commits")
+    if payload.get("forced") or commits is None or len(commits) >= PUSH_PAYLOAD_MAX_COMMITS:
+        return {DATA_DIR_PATH}
+
+    paths = set()
+    for commit in commits:
+        for key in ("added", "modified", "removed"):
+            paths.update(commit.get(key, []))
+    return paths
+
+
+class GitHubWebhookReceiver:
+    """HTTP-эндпоинт для webhook'ов push из GitHub.
+
+    Принимает POST на path, проверяет подпись секретом и передаёт изменённые
+    пути в on_change (корутина). on_change выполняется фоновой задачей уже
+    после ответа, чтобы GitHub не ждал перезагрузки данных. Сервер минимальный,
+    на asyncio, без дополнительных зависимостей; его стоит ставить за обратный
+    прокси с TLS.
+    """
+
+    def __init__(self, secret, on_change, host, port, path, branch=None):
+        self.secret = secret
+        self.on_change = on_change
+        self.host = host
+        self.port = port
+        self.path = path
+        self.branch = branch
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info(f"Webhook GitHub принимается на {self.host}:{self.port}{self.path}")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _handle_connection(self, reader, writer):
+        paths = None
+        try:
+            status, paths = await asyncio.wait_for(self._handle_request(reader), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook GitHub: запрос не получен полностью за отведённое время")
+            status = 408
+        except Exception as e:
+            logger.error(f"Ошибка при обработке webhook GitHub: {e}")
+            status = 400
+        try:
+            writer.write(
+                f"HTTP/1.1 {status} {RESPONSE_REASONS[status]}\r\n"
+                "Content-Length: 0\r\nConnection: close\r\n\r\n".encode('ascii')
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+        if paths:
+            task = asyncio.create_task(self._notify(paths))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _notify(self, paths):
+        try:
+            await self.on_change(paths)
+        except Exception as e:
+            logger.error(f"Ошибка при обработке изменений из webhook GitHub: {e}")
+
+    async def _handle_request(self, reader):
+        """Разобрать запрос: (код ответа, изменённые пути или None)"""
+        method, target, _ = (await reader.readline()).decode('latin-1').split(" ", 2)
+        headers = {}
+        for _ in range(MAX_HEADER_LINES + 1):
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            return 431, None
+
+        if target.split("?", 1)[0] != self.path:
+            return 404, None
+        if method != "POST":
+            return 405, None
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE:
+            return 413, None
+        body = await reader.readexactly(length)
+
+        if not verify_signature(self.secret, body, headers.get("x-hub-signature-256")):
+            logger.warning("Отклонён webhook GitHub с неверной подписью")
+            return 401, None
+
+        event = headers.get("x-github-event")
+        if event == "ping":
+            return 200, None
+        if event != "push":
+            return 202, None
+
+        paths = changed_paths(json.loads(body), self.branch)
+        if paths:
+            logger.info(f"Webhook GitHub: изменено файлов - {len(paths)}")
+        return 204, paths
+
+
+async def send_test_push(url, secret, paths, branch):
+    """Отправить подписанный push с указанными путями (локальная проверка эндпоинта)"""
+    import httpx
+
+    payload = {
+        "ref": f"refs/heads/{branch}",
+        "repository": {"default_branch": branch},
+        "commits": [{"added": [], "modified": list(paths), "removed": []}],
+    }
+    body = json.dumps(payload).encode('utf-8')
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, content=body, headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": "push",
+            "X-Hub-Signature-256": sign_payload(secret, body),
+        })
+    return response.status_code
+
+
+if __name__ == "__main__":
+    # python -m utils.github_webhook http://localhost:8081/github-webhook SECRET data/schedule.json
+    parser = argparse.ArgumentParser(description="Отправить тестовый webhook push")
+    parser.add_argument("url")
+    parser.add_argument("secret")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--branch", default="main")
+    args = parser.parse_args()
+    print(asyncio.run(send_test_push(args.url, args.secret, args.paths, args.branch)))
@@ -142,44 +142,6 @@ def get_next_weekend_dates():
     
     return weekend_dates
 
-def get_available_times_for_venue(venue, date, schedule_data):
-    """Получить доступные времена для зала на указанную дату"""
-    # Стандартные временные слоты
-    standard_times = [
-        "09:00", "10:30", "12:00", "13:30", "15:00", 
-        "16:30", "18:00", "19:30", "21:00"
-    ]
-    
-    # Получаем все матчи в этом зале на эту дату
-    occupied_times = []
-    for stage in schedule_data.get("stages", []):
-        for game in stage.get("games", []):
-            if (game.get("location") == venue and 
-                game.get("date") == date and 
-                game.get("time")):
-                occupied_times.append(game.get("time"))
-    
-    # Фильтруем стандартные времена
-    available_times = [time for time in standard_times if time not in occupied_times]
-    
-    # Если есть занятые времена, предлагаем время через 1.5 часа после последней игры
-    if occupied_times:
-        last_time = max(occupied_times)
-        try:
-            last_dt = datetime.strptime(f"{date} {last_time}", "%Y-%m-%d %H:%M")
-            next_dt = last_dt + timedelta(hours=1.5)
-            next_time = next_dt.strftime("%H:%M")
-            
-            # Добавляем это время в доступные, если оно не занято и в пределах дня
-            if (next_time not in occupied_times and 
-                next_time not in available_times and
-                next_dt.hour < 22):  # Не позже 22:00
-                available_times.append(f"⏰ Через 1.5ч ({next_time})")
-        except:
-            pass
-    
-    return available_times
-
 def format_date_for_display(date_str):
     """Форматировать дату для отображения"""
     try:
@@ -0,0 +1,108 @@
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from config import (STATS_IMAGE_FORMAT, STATS_IMAGE_MAX_SIDE, STATS_IMAGE_QUALITY, STATS_IMAGE_WORKERS,
+                    STATS_THUMBNAIL_SIDE)
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(image, image_format, quality):
+    buffer = io.BytesIO()
+    if image_format == "WEBP":
+        image.save(buffer, "WEBP", quality=quality, method=6)
+    else:
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def detect_image_format(image_data):
+    """Формат изображения по сигнатуре файла ("JPEG", "PNG", "WEBP") или None"""
+    if image_data[:3] == b"\xff\xd8\xff":
+        return "JPEG"
+    if image_data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "PNG"
+    if image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def perceptual_hash(image, size=8):
+    """dHash: 64-битный хэш по разности яркости соседних пикселей (hex-строка)"""
+    pixels = image.convert("L").resize((size + 1, size), Image.LANCZOS).tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def hash_distance(first, second):
+    """Расстояние Хэмминга между двумя перцептивными хэшами"""
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def normalize_image(image_data, image_format, max_side, quality, thumbnail_side):
+    """Нормализовать фото статистики: (изображение, миниатюра, перцептивный хэш).
+
+    Поворот по EXIF применяется к пикселям, сами метаданные (EXIF, GPS) не
+    сохраняются. Размер ограничивается max_side по большей стороне, результат
+    перекодируется в progressive JPEG или WebP. Выполняется в отдельном процессе.
+    """
+    with Image.open(io.BytesIO(image_data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    normalized = _encode(image, image_format, quality)
+    image_hash = perceptual_hash(image)
+
+    image.thumbnail((thumbnail_side, thumbnail_side), Image.LANCZOS)
+    thumbnail = _encode(image, image_format, quality)
+    return normalized, thumbnail, image_hash
+
+
+class ImageProcessor:
+    """Обработка изображений статистики в пуле процессов, не блокирующая цикл событий"""
+
+    def __init__(self, workers=STATS_IMAGE_WORKERS):
+        self.workers = workers
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def normalize(self, image_data):
+        """Вернуть (изображение, миниатюра, перцептивный хэш) или None.
+
+        При ошибке возвращаются исходные данные без миниатюры и хэша, если они
+        уже в формате STATS_IMAGE_FORMAT (имя файла задаётся этим форматом).
+        Изображение в другом формате отклоняется - возвращается None.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            normalized, thumbnail, image_hash = await loop.run_in_executor(
+                self._get_pool(), normalize_image, image_data,
+                STATS_IMAGE_FORMAT, STATS_IMAGE_MAX_SIDE, STATS_IMAGE_QUALITY, STATS_THUMBNAIL_SIDE
+            )
+            logger.info(f"Изображение обработано: {len(image_data)} -> {len(normalized)} байт")
+            return normalized, thumbnail, image_hash
+        except Exception as e:
+            original_format = detect_image_format(image_data)
+            if original_format != STATS_IMAGE_FORMAT:
+                logger.error(f"Ошибка при обработке изображения ({original_format or 'неизвестный формат'}), "
+                             f"изображение отклонено: {e}")
+                return None
+            logger.error(f"Ошибка при обработке изображения, сохраняется исходное: {e}")
+            return image_data, None, None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None